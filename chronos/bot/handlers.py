@@ -1,17 +1,84 @@
-from datetime import datetime, timedelta
+import asyncio
+from bisect import bisect_right
+from datetime import date, datetime, timedelta
 import logging
-import time as time_module
+from zoneinfo import ZoneInfo
 
 import httpx
 from telegram import Update
 from telegram.ext import Application, CommandHandler, ContextTypes, filters
-from telegram.constants import ParseMode
 from telegram.error import Conflict
 
 from ..config import settings as config
 from ..config import constants
-from ..data.database import get_daily_stats_from_db, get_monthly_stats_from_db, get_weekly_stats_from_db, get_past_day_stats_from_db, get_past_week_stats_from_db, set_leetcode_target, get_leetcode_target
-from ..integrations.leetcode import get_leetcode_submission_details, get_leetcode_cookies, get_leetcode_headers
+from ..data.database import get_daily_stats_from_db, get_monthly_stats_from_db, get_weekly_stats_from_db, get_past_day_stats_from_db, get_past_week_stats_from_db, get_all_stats_from_db, set_leetcode_target, get_leetcode_target, get_stats_version
+from ..integrations.leetcode import get_leetcode_submission_details, get_leetcode_problem_difficulty, get_leetcode_cookies, get_leetcode_headers, RECENT_AC_SUBMISSIONS_QUERY
+from ..integrations.http_client import get_http_client
+from .messaging import format_new_solve_message, escape_md, SEND_KW
+
+_TZ = ZoneInfo(config.TIMEZONE)
+
+# Maps each summary period to its stats query and the target type it is measured against
+_PERIOD_STATS = {
+    'daily': (get_daily_stats_from_db, 'daily'),
+    'weekly': (get_weekly_stats_from_db, 'weekly'),
+    'monthly': (get_monthly_stats_from_db, 'monthly'),
+    'past_day': (get_past_day_stats_from_db, 'daily'),
+    'past_week': (get_past_week_stats_from_db, 'weekly'),
+}
+
+# Periods served together by get_all_stats_from_db
+_CURRENT_PERIODS = ('daily', 'weekly', 'monthly')
+
+# Formatted summaries per period, keyed by the day and stats version they were built from
+_summary_cache: dict[str, tuple[tuple[date, int], str, int]] = {}
+
+_date_cache: dict[tuple[date, str], str] = {}
+
+_SEP = "\n\n━━━━━━━━━━━━━━━\n\n"
+
+# Message templates are built once at import and filled with format_map; they are MarkdownV2,
+# so static punctuation is escaped here and text fields are passed through escape_md
+_REPORT_TMPL = (
+    "📊 *{title}*\n"
+    "🗓️ *{label}:* {period}\n"
+    "🚀 *Progress Overview*"
+    + _SEP + "{details}" + _SEP +
+    "🎯 *Grand Total Solved {when}:* {total}"
+)
+
+_LC_SUMMARY_TMPL = (
+    "💻 *LeetCode Summary*\n"
+    "↦ 🟢 *Easy:* {easy}\n"
+    "↦ 🟡 *Medium:* {medium}\n"
+    "↦ 🔴 *Hard:* {hard}\n"
+    "↦ ❓ *Other/Unrated:* {na}\n"
+    "✅ *Total LeetCode:* {total} problems"
+)
+
+_CF_SUMMARY_TMPL = (
+    "⚔️ *Codeforces Summary*\n"
+    "↦ 🥉 *800–1000:* {}\n"
+    "↦ 🥈 *1100–1300:* {}\n"
+    "↦ 🥇 *1400–1600:* {}\n"
+    "↦ 🏆 *1700\\+:* {}\n"
+    "↦ ❓ *Unrated/Other:* {}\n"
+    "✅ *Total Codeforces:* {} problems"
+)
+
+_TARGET_BARS_TMPL = (
+    "🟢 Easy: {easy}\n"
+    "🟡 Medium: {medium}\n"
+    "🔴 Hard: {hard}"
+)
+
+# bisect_right over these edges yields a slot that _CF_BAND_INDEX maps to a rating band;
+# ratings below 800 or in the gaps between bands fall into the "Other" bucket (4).
+_CF_BAND_EDGES = (800, 1001, 1100, 1301, 1400, 1601, 1700)
+_CF_BAND_INDEX = (4, 0, 4, 1, 4, 2, 4, 3)
+
+# Every possible bar, indexed by the number of filled blocks
+_BARS = tuple("▰" * filled + "═" * (10 - filled) for filled in range(11))
 
 def _format_progress_bar(current: int, target: int) -> str:
     if target == 0:
@@ -19,69 +86,38 @@ def _format_progress_bar(current: int, target: int) -> str:
         return str(current) if current > 0 else "─"
     
     percentage = min(100, (current / target) * 100)
-    filled_blocks = round(percentage / 10)
-    filled_blocks = min(10, filled_blocks)
+    filled_blocks = min(10, round(percentage / 10))
+    indicator = " ✅" if current >= target else " ❌"
     
-    filled = "▰"
-    empty = "═"
-    
-    progress_bar = filled * filled_blocks + empty * (10 - filled_blocks)
-    
-    if current >= target:
-        indicator = " ✅"  
-    else:
-        indicator = " ❌" 
-    
-    return f"{progress_bar} {current}/{target}{indicator}"
+    return f"{_BARS[filled_blocks]} {current}/{target}{indicator}"
 
 
 def _format_summary_message(stats: dict, target_type: str = None) -> tuple[str, int]:
     """Formats the complete summary message from a stats dictionary."""
     lc_stats = stats.get("leetcode", {})
     cf_stats = stats.get("codeforces", {})
-    
-    # LeetCode stats
-    lc_easy = 0
-    lc_medium = 0
-    lc_hard = 0
-    lc_na = 0
-
-    for difficulty, count in lc_stats.items():
-        if difficulty == "Easy":
-            lc_easy += count
-        elif difficulty == "Medium":
-            lc_medium += count
-        elif difficulty == "Hard":
-            lc_hard += count
-        else:
-            lc_na += count
-    
+
+    # Nothing solved yet; callers only use the details when the grand total is non-zero
+    if not lc_stats and not cf_stats:
+        return "", 0
+
+    # LeetCode stats: Easy, Medium, Hard, Other
+    lc_easy = lc_stats.get("Easy", 0)
+    lc_medium = lc_stats.get("Medium", 0)
+    lc_hard = lc_stats.get("Hard", 0)
     lc_total = sum(lc_stats.values())
+    lc_na = lc_total - lc_easy - lc_medium - lc_hard
 
-    # Codeforces stats aggregation
-    cf_800_1000 = 0
-    cf_1100_1300 = 0
-    cf_1400_1600 = 0
-    cf_1700_plus = 0
-    cf_na = 0
-    
+    # Codeforces stats aggregation: 800-1000, 1100-1300, 1400-1600, 1700+, Other
+    cf_buckets = [0, 0, 0, 0, 0]
     for rating_str, count in cf_stats.items():
-        if str(rating_str).isdigit():
+        try:
             rating = int(rating_str)
-            if 800 <= rating <= 1000:
-                cf_800_1000 += count
-            elif 1100 <= rating <= 1300:
-                cf_1100_1300 += count
-            elif 1400 <= rating <= 1600:
-                cf_1400_1600 += count
-            elif rating >= 1700:
-                cf_1700_plus += count
-            else: # For ratings outside defined bands but still digits
-                cf_na += count 
-        else:
-            cf_na += count
-            
-    cf_total = sum(cf_stats.values())
+        except (TypeError, ValueError):
+            cf_buckets[4] += count
+            continue
+        cf_buckets[_CF_BAND_INDEX[bisect_right(_CF_BAND_EDGES, rating)]] += count
+    cf_total = sum(cf_buckets)
     grand_total = lc_total + cf_total
     
     message_parts = []
@@ -90,40 +126,18 @@ def _format_summary_message(stats: dict, target_type: str = None) -> tuple[str,
         targets = get_leetcode_target(target_type) if target_type else {'easy': 0, 'medium': 0, 'hard': 0}
         
         if target_type and (targets['easy'] > 0 or targets['medium'] > 0 or targets['hard'] > 0):
-            lc_summary = (
-                f"💻 *LeetCode Summary*\n"
-                f"↦ 🟢 *Easy:* {_format_progress_bar(lc_easy, targets['easy'])}\n"
-                f"↦ 🟡 *Medium:* {_format_progress_bar(lc_medium, targets['medium'])}\n"
-                f"↦ 🔴 *Hard:* {_format_progress_bar(lc_hard, targets['hard'])}\n"
-                f"↦ ❓ *Other/Unrated:* {lc_na}\n"
-                f"✅ *Total LeetCode:* {lc_total} problems"
-            )
+            easy = _format_progress_bar(lc_easy, targets['easy'])
+            medium = _format_progress_bar(lc_medium, targets['medium'])
+            hard = _format_progress_bar(lc_hard, targets['hard'])
         else:
             # Show normal summary without targets
-            lc_summary = (
-                f"💻 *LeetCode Summary*\n"
-                f"↦ 🟢 *Easy:* {lc_easy}\n"
-                f"↦ 🟡 *Medium:* {lc_medium}\n"
-                f"↦ 🔴 *Hard:* {lc_hard}\n"
-                f"↦ ❓ *Other/Unrated:* {lc_na}\n"
-                f"✅ *Total LeetCode:* {lc_total} problems"
-            )
-        message_parts.append(lc_summary)
+            easy, medium, hard = lc_easy, lc_medium, lc_hard
+        message_parts.append(_LC_SUMMARY_TMPL.format(easy=easy, medium=medium, hard=hard, na=lc_na, total=lc_total))
 
     if cf_total > 0:
-        cf_summary = (
-            f"⚔️ *Codeforces Summary*\n"
-            f"↦ 🥉 *800–1000:* {cf_800_1000}\n"
-            f"↦ 🥈 *1100–1300:* {cf_1100_1300}\n"
-            f"↦ 🥇 *1400–1600:* {cf_1400_1600}\n"
-            f"↦ 🏆 *1700+:* {cf_1700_plus}\n"
-            f"↦ ❓ *Unrated/Other:* {cf_na}\n"
-            f"✅ *Total Codeforces:* {cf_total} problems"
-        )
-        message_parts.append(cf_summary)
+        message_parts.append(_CF_SUMMARY_TMPL.format(*cf_buckets, cf_total))
 
     if target_type and lc_total > 0:
-        targets = get_leetcode_target(target_type)
         if targets['easy'] > 0 or targets['medium'] > 0 or targets['hard'] > 0:
             targets_met = 0
             total_targets = 0
@@ -144,43 +158,104 @@ def _format_summary_message(stats: dict, target_type: str = None) -> tuple[str,
                     targets_met += 1
             
             if targets_met == total_targets:
-                achievement_status = "🎉 *All targets achieved!* Excellent work! 💪"
+                achievement_status = "🎉 *All targets achieved\\!* Excellent work\\! 💪"
             elif targets_met > 0:
-                achievement_status = f"🎯 *{targets_met}/{total_targets} targets achieved.* Keep pushing! 🚀"
+                achievement_status = f"🎯 *{targets_met}/{total_targets} targets achieved\\.* Keep pushing\\! 🚀"
             else:
-                achievement_status = f"💪 *0/{total_targets} targets achieved.* Let's get started! 🔥"
+                achievement_status = f"💪 *0/{total_targets} targets achieved\\.* Let's get started\\! 🔥"
             
             message_parts.append(achievement_status)
 
-    details = "\n\n━━━━━━━━━━━━━━━\n\n".join(message_parts)
+    details = _SEP.join(message_parts)
     return details, grand_total
 
 
-def get_daily_summary_message() -> str:
+def _build_report(title: str, label: str, period: str, details: str, when: str, total: int) -> str:
+    """Fills the shared report template with a period's title, date label and summary details."""
+    return _REPORT_TMPL.format_map({
+        'title': escape_md(title),
+        'label': escape_md(label),
+        'period': escape_md(period),
+        'details': details,
+        'when': escape_md(when),
+        'total': total,
+    })
+
+
+def _format_target_bars(targets: dict) -> str:
+    """Formats empty progress bars for each LeetCode target, used when nothing has been solved yet."""
+    return _TARGET_BARS_TMPL.format_map({
+        'easy': _format_progress_bar(0, targets['easy']),
+        'medium': _format_progress_bar(0, targets['medium']),
+        'hard': _format_progress_bar(0, targets['hard']),
+    })
+
+
+def _format_date(fmt: str, days_ago: int = 0) -> str:
+    """Formats today's date (or the date `days_ago` days back), reusing the string until the day changes."""
+    day = date.today() - timedelta(days=days_ago)
+    key = (day, fmt)
+    formatted = _date_cache.get(key)
+    if formatted is None:
+        if len(_date_cache) >= 16:
+            # Entries for past days are never hit again
+            _date_cache.clear()
+        formatted = _date_cache[key] = day.strftime(fmt)
+    return formatted
+
+
+def _format_week_range(weeks_ago: int = 0) -> str:
+    """Formats the Monday to Sunday range of the current week (or `weeks_ago` weeks back), cached like _format_date."""
+    today = date.today()
+    start_of_week = today - timedelta(days=today.weekday() + 7 * weeks_ago)
+    key = (start_of_week, "week")
+    formatted = _date_cache.get(key)
+    if formatted is None:
+        if len(_date_cache) >= 16:
+            _date_cache.clear()
+        end_of_week = start_of_week + timedelta(days=6)
+        formatted = _date_cache[key] = f"{start_of_week.strftime('%b %d')} - {end_of_week.strftime('%b %d, %Y')}"
+    return formatted
+
+
+def _cached_summary(period: str) -> tuple[str, int]:
+    """Returns the formatted summary for a period, recomputing it only after a new solve, a target change or a day rollover."""
+    # Read the version before querying so a solve logged mid-query forces a recompute next time
+    today = datetime.now(_TZ).date()
+    key = (today, get_stats_version())
+    cached = _summary_cache.get(period)
+    if cached and cached[0] == key:
+        return cached[1], cached[2]
+
+    if period in _CURRENT_PERIODS:
+        # One query covers today, this week and this month, so refresh all three entries together
+        all_stats = get_all_stats_from_db(today)
+        for current in _CURRENT_PERIODS:
+            _summary_cache[current] = (key, *_format_summary_message(all_stats[current], _PERIOD_STATS[current][1]))
+        return _summary_cache[period][1], _summary_cache[period][2]
+
+    get_stats, target_type = _PERIOD_STATS[period]
+    summary_details, grand_total = _format_summary_message(get_stats(today), target_type)
+    _summary_cache[period] = (key, summary_details, grand_total)
+    return summary_details, grand_total
+
+
+async def get_daily_summary_message() -> str:
     """Generates the daily summary message content."""
-    stats = get_daily_stats_from_db()
-    summary_details, grand_total = _format_summary_message(stats, 'daily')
+    summary_details, grand_total = await asyncio.to_thread(_cached_summary, 'daily')
 
     if grand_total == 0:
-        return "yet another uneventful day."
+        return "yet another uneventful day\\."
     
-    date_str = datetime.now().strftime("%B %d, %Y")
-
-    return (
-        f"📊 *Daily Coding Report*\n"
-        f"🗓️ *Date:* {date_str}\n"
-        f"🚀 *Progress Overview*\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"{summary_details}\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"🎯 *Grand Total Solved Today:* {grand_total}"
-    )
+    date_str = _format_date("%B %d, %Y")
+
+    return _build_report("Daily Coding Report", "Date", date_str, summary_details, "Today", grand_total)
 
 async def send_daily_summary(context: ContextTypes.DEFAULT_TYPE):
     """Sends the daily summary message to the channel."""
     logging.info("Sending daily summary...")
-    message = get_daily_summary_message()
-    await context.bot.send_message(config.CHANNEL_ID, message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
+    message = await get_daily_summary_message()
+    await context.bot.send_message(config.CHANNEL_ID, message, **SEND_KW)
     logging.info("Daily summary sent.")
 
 
@@ -189,327 +264,211 @@ async def test_codeforces_submission(app: Application):
     logging.info("--- Testing Codeforces Submission ---")
     try:
         method_name = "user.status"
-        params_for_sig = {
-            "handle": config.CF_HANDLE,
-            "from": 1,
-            "count": 1,
-            "apiKey": config.CF_API_KEY,
-            "time": int(time_module.time()),
-        }
         # Lazy import to avoid circular dependency
-        from ..integrations.codeforces import generate_api_sig
-        api_sig_hash = generate_api_sig(method_name, **params_for_sig)
-        params = params_for_sig.copy()
-        params["apiSig"] = "123456" + api_sig_hash
+        from ..integrations.codeforces import build_user_status_params
+        params = build_user_status_params(1)
         
-        # Use async httpx for non-blocking requests
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(constants.CODEFORCES_API_URL + f"/{method_name}", params=params)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.get(constants.CODEFORCES_API_URL + f"/{method_name}", params=params)
+        response.raise_for_status()
+        data = response.json()
 
         if data["status"] == "OK" and data["result"]:
             submission = data["result"][0]
             problem = submission["problem"]
             problem_url = f"https://codeforces.com/contest/{problem['contestId']}/problem/{problem['index']}"
-            verdict = submission.get('verdict', 'N/A')
-            message = (
-                f"👾 *[TEST] Latest Submission* 👾\n\n"
-                f"**Platform:** Codeforces\n"
-                f"**Problem:** [{problem['name']}]({problem_url})\n"
-                f"**Verdict:** {verdict}\n"
-                f"**Language:** {submission['programmingLanguage']}\n"
-                f"**Time:** {submission['timeConsumedMillis']} ms\n"
-                f"**Memory:** {submission['memoryConsumedBytes'] // 1024} KB"
+            message = format_new_solve_message(
+                platform="Codeforces",
+                problem_name=problem['name'],
+                problem_url=problem_url,
+                difficulty=str(problem.get('rating', 'NA')),
+                language=submission['programmingLanguage'],
+                runtime=f"{submission['timeConsumedMillis']} ms",
+                memory=f"{submission['memoryConsumedBytes'] // 1024} KB",
+                test=True,
+                verdict=submission.get('verdict', 'N/A')
             )
-            await app.bot.send_message(config.CHANNEL_ID, message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
-            logging.info(f"Sent Codeforces test notification for submission {submission['id']}.")
+            await app.bot.send_message(config.CHANNEL_ID, message, **SEND_KW)
+            logging.info("Sent Codeforces test notification for submission %s.", submission['id'])
         else:
-            logging.warning(f"Could not fetch latest Codeforces submission. Status: {data.get('comment')}")
+            logging.warning("Could not fetch latest Codeforces submission. Status: %s", data.get('comment'))
     except httpx.RequestError as e:
-        logging.error(f"An error occurred with Codeforces API during test: {e}")
+        logging.error("An error occurred with Codeforces API during test: %s", e)
     except httpx.HTTPStatusError as e:
-        logging.error(f"Codeforces API returned error status {e.response.status_code} during test: {e}")
+        logging.error("Codeforces API returned error status %s during test: %s", e.response.status_code, e)
     except httpx.TimeoutException as e:
-        logging.error(f"Codeforces API request timed out during test: {e}")
+        logging.error("Codeforces API request timed out during test: %s", e)
     except Exception as e:
-        logging.error(f"An unexpected error occurred during Codeforces test: {e}", exc_info=True)
+        logging.error("An unexpected error occurred during Codeforces test: %s", e, exc_info=True)
 
 
 async def test_leetcode_submission(app: Application):
     """Fetches the latest LC submission and sends a test notification."""
     logging.info("--- Testing LeetCode Submission ---")
     graphql_query = {
-        "query": """
-            query recentAcSubmissions($username: String!, $limit: Int!) {
-              recentAcSubmissionList(username: $username, limit: $limit) {
-                id
-                title
-                titleSlug
-                timestamp
-                lang
-              }
-            }
-        """,
+        "query": RECENT_AC_SUBMISSIONS_QUERY,
         "variables": {"username": config.LEETCODE_USERNAME, "limit": 1}
     }
     cookies = get_leetcode_cookies()
     headers = get_leetcode_headers()
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
+        response.raise_for_status()
+        data = response.json()
 
         if "errors" in data:
-            logging.error(f"LeetCode API error on test fetch: {data['errors']}")
+            logging.error("LeetCode API error on test fetch: %s", data['errors'])
             return
 
         submissions = data.get("data", {}).get("recentAcSubmissionList", [])
         if submissions:
             sub = submissions[0]
             problem_url = f"https://leetcode.com/problems/{sub['titleSlug']}/"
-            message = (
-                f"👾 *[TEST] Latest Submission* 👾\n\n"
-                f"**Platform:** LeetCode\n"
-                f"**Problem:** [{sub['title']}]({problem_url})\n"
-                f"**Language:** {sub['lang']}"
+            details, difficulty = await asyncio.gather(
+                get_leetcode_submission_details(int(sub['id'])),
+                get_leetcode_problem_difficulty(sub['titleSlug'])
             )
-            details = await get_leetcode_submission_details(int(sub['id']))
+            runtime = memory = note = None
             if details and details.get('runtime') is not None and details.get('memory') is not None:
-                memory_kb = details['memory'] // 1024
-                message += f"\n**Runtime:** {details['runtime']} ms\n**Memory:** {memory_kb} KB"
+                runtime = f"{details['runtime']} ms"
+                memory = f"{details['memory'] // 1024} KB"
             else:
-                 message += "\n_(Could not fetch runtime/memory details)_"
-            await app.bot.send_message(config.CHANNEL_ID, message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
-            logging.info(f"Sent LeetCode test notification for submission ID {sub['id']}")
+                note = "(Could not fetch runtime/memory details)"
+            message = format_new_solve_message(
+                platform="LeetCode",
+                problem_name=sub['title'],
+                problem_url=problem_url,
+                difficulty=difficulty,
+                language=sub['lang'],
+                runtime=runtime,
+                memory=memory,
+                test=True,
+                note=note
+            )
+            await app.bot.send_message(config.CHANNEL_ID, message, **SEND_KW)
+            logging.info("Sent LeetCode test notification for submission ID %s", sub['id'])
         else:
             logging.warning("Could not find any recent LeetCode submissions to test.")
     except Exception as e:
-        logging.error(f"An error occurred during LeetCode test: {e}", exc_info=True)
-
-
-async def stats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Replies with the current daily stats."""
-    stats = get_daily_stats_from_db()
-    summary_details, grand_total = _format_summary_message(stats, 'daily')
+        logging.error("An error occurred during LeetCode test: %s", e, exc_info=True)
+
+
+async def _reply_with_stats(
+    update: Update,
+    period: str,
+    title: str,
+    label: str,
+    period_str: str,
+    when: str,
+    empty_header: str,
+    targets_heading: str,
+    empty_message: str,
+    plain_empty_message: str = None,
+):
+    """Replies with a period's report, or with its target bars and `empty_message` when nothing was solved."""
+    summary_details, grand_total = await asyncio.to_thread(_cached_summary, period)
 
     if grand_total == 0:
-        # Check if there are daily targets set
-        targets = get_leetcode_target('daily')
+        targets = await asyncio.to_thread(get_leetcode_target, _PERIOD_STATS[period][1])
         if targets['easy'] > 0 or targets['medium'] > 0 or targets['hard'] > 0:
             target_summary = (
-                f"📊 *Today's Progress*\n"
-                f"🎯 *Daily Targets:*\n"
-                f"🟢 Easy: {_format_progress_bar(0, targets['easy'])}\n"
-                f"🟡 Medium: {_format_progress_bar(0, targets['medium'])}\n"
-                f"🔴 Hard: {_format_progress_bar(0, targets['hard'])}\n\n"
-                f"You haven't solved any new problems yet today. Let's get started! 💪"
+                f"{empty_header}\n"
+                f"🎯 *{escape_md(targets_heading)}:*\n"
+                f"{_format_target_bars(targets)}\n\n"
+                f"{escape_md(empty_message)}"
             )
-            await update.message.reply_text(target_summary, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
+            await update.message.reply_text(target_summary, **SEND_KW)
         else:
-            summary_message = "You haven't solved any new problems yet today. Let's get started! 💪"
-            await update.message.reply_text(summary_message, disable_web_page_preview=True)
+            await update.message.reply_text(plain_empty_message or empty_message, disable_web_page_preview=True)
         return
 
-    date_str = datetime.now().strftime("%B %d, %Y")
+    summary_message = _build_report(title, label, period_str, summary_details, when, grand_total)
+    await update.message.reply_text(summary_message, **SEND_KW)
 
-    summary_message = (
-        f"📊 *Today's Progress So Far*\n"
-        f"🗓️ *Date:* {date_str}\n"
-        f"🚀 *Progress Overview*\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"{summary_details}\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"🎯 *Grand Total Solved Today:* {grand_total}"
+async def stats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Replies with the current daily stats."""
+    await _reply_with_stats(
+        update, 'daily', "Today's Progress So Far", "Date", _format_date("%B %d, %Y"), "Today",
+        empty_header="📊 *Today's Progress*",
+        targets_heading="Daily Targets",
+        empty_message="You haven't solved any new problems yet today. Let's get started! 💪",
     )
-    
-    await update.message.reply_text(summary_message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
 
 async def monthly_stats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Replies with the current monthly stats."""
-    stats = get_monthly_stats_from_db()
-    summary_details, grand_total = _format_summary_message(stats, 'monthly')
-
-    if grand_total == 0:
-        # Check if there are monthly targets set
-        targets = get_leetcode_target('monthly')
-        if targets['easy'] > 0 or targets['medium'] > 0 or targets['hard'] > 0:
-            current_date = datetime.now()
-            month_year = current_date.strftime("%B %Y")
-            target_summary = (
-                f"📊 *Monthly Progress Report*\n"
-                f"🗓️ *Period:* {month_year}\n"
-                f"🎯 *Monthly Targets:*\n"
-                f"🟢 Easy: {_format_progress_bar(0, targets['easy'])}\n"
-                f"🟡 Medium: {_format_progress_bar(0, targets['medium'])}\n"
-                f"🔴 Hard: {_format_progress_bar(0, targets['hard'])}\n\n"
-                f"You haven't solved any new problems this month yet. Let's get started! 💪"
-            )
-            await update.message.reply_text(target_summary, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
-        else:
-            summary_message = "You haven't solved any new problems this month yet. Let's get started! 💪"
-            await update.message.reply_text(summary_message, disable_web_page_preview=True)
-        return
-
-    current_date = datetime.now()
-    month_year = current_date.strftime("%B %Y")
-
-    summary_message = (
-        f"📊 *Monthly Progress Report*\n"
-        f"🗓️ *Period:* {month_year}\n"
-        f"🚀 *Progress Overview*\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"{summary_details}\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"🎯 *Grand Total Solved This Month:* {grand_total}"
+    month_year = _format_date("%B %Y")
+    await _reply_with_stats(
+        update, 'monthly', "Monthly Progress Report", "Period", month_year, "This Month",
+        empty_header=f"📊 *Monthly Progress Report*\n🗓️ *Period:* {escape_md(month_year)}",
+        targets_heading="Monthly Targets",
+        empty_message="You haven't solved any new problems this month yet. Let's get started! 💪",
     )
-    
-    await update.message.reply_text(summary_message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
 
 async def weekly_stats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Replies with the current weekly stats."""
-    stats = get_weekly_stats_from_db()
-    summary_details, grand_total = _format_summary_message(stats, 'weekly')
-
-    current_date = datetime.now()
-    # Calculate week range (Monday to Sunday)
-    days_since_monday = current_date.weekday()
-    start_of_week = current_date - timedelta(days=days_since_monday)
-    end_of_week = start_of_week + timedelta(days=6)
-    week_range = f"{start_of_week.strftime('%b %d')} - {end_of_week.strftime('%b %d, %Y')}"
-
-    if grand_total == 0:
-        # Check if there are weekly targets set
-        targets = get_leetcode_target('weekly')
-        if targets['easy'] > 0 or targets['medium'] > 0 or targets['hard'] > 0:
-            target_summary = (
-                f"📊 *Weekly Progress Report*\n"
-                f"🗓️ *Period:* {week_range}\n"
-                f"🎯 *Weekly Targets:*\n"
-                f"🟢 Easy: {_format_progress_bar(0, targets['easy'])}\n"
-                f"🟡 Medium: {_format_progress_bar(0, targets['medium'])}\n"
-                f"🔴 Hard: {_format_progress_bar(0, targets['hard'])}\n\n"
-                f"You haven't solved any new problems this week yet. Let's get started! 💪"
-            )
-            await update.message.reply_text(target_summary, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
-        else:
-            summary_message = "You haven't solved any new problems this week yet. Let's get started! 💪"
-            await update.message.reply_text(summary_message, disable_web_page_preview=True)
-        return
-
-    summary_message = (
-        f"📊 *Weekly Progress Report*\n"
-        f"🗓️ *Period:* {week_range}\n"
-        f"🚀 *Progress Overview*\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"{summary_details}\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"🎯 *Grand Total Solved This Week:* {grand_total}"
+    week_range = _format_week_range()
+    await _reply_with_stats(
+        update, 'weekly', "Weekly Progress Report", "Period", week_range, "This Week",
+        empty_header=f"📊 *Weekly Progress Report*\n🗓️ *Period:* {escape_md(week_range)}",
+        targets_heading="Weekly Targets",
+        empty_message="You haven't solved any new problems this week yet. Let's get started! 💪",
     )
-    
-    await update.message.reply_text(summary_message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
 
 async def past_day_stats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Replies with yesterday's stats."""
-    stats = get_past_day_stats_from_db()
-    summary_details, grand_total = _format_summary_message(stats, 'daily')
-
-    if grand_total == 0:
-        # Check if there are daily targets set for reference
-        targets = get_leetcode_target('daily')
-        if targets['easy'] > 0 or targets['medium'] > 0 or targets['hard'] > 0:
-            yesterday = datetime.now() - timedelta(days=1)
-            date_str = yesterday.strftime("%B %d, %Y")
-            target_summary = (
-                f"📊 *Yesterday's Progress Report*\n"
-                f"🗓️ *Date:* {date_str}\n"
-                f"🎯 *Daily Targets (for reference):*\n"
-                f"🟢 Easy: {_format_progress_bar(0, targets['easy'])}\n"
-                f"🟡 Medium: {_format_progress_bar(0, targets['medium'])}\n"
-                f"🔴 Hard: {_format_progress_bar(0, targets['hard'])}\n\n"
-                f"You didn't solve any new problems yesterday. 📅"
-            )
-            await update.message.reply_text(target_summary, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
-        else:
-            yesterday = datetime.now() - timedelta(days=1)
-            date_str = yesterday.strftime("%B %d, %Y")
-            summary_message = f"You didn't solve any new problems on {date_str}. 📅"
-            await update.message.reply_text(summary_message, disable_web_page_preview=True)
-        return
-
-    yesterday = datetime.now() - timedelta(days=1)
-    date_str = yesterday.strftime("%B %d, %Y")
-
-    summary_message = (
-        f"📊 *Yesterday's Progress Report*\n"
-        f"🗓️ *Date:* {date_str}\n"
-        f"🚀 *Progress Overview*\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"{summary_details}\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"🎯 *Grand Total Solved Yesterday:* {grand_total}"
+    date_str = _format_date("%B %d, %Y", days_ago=1)
+    await _reply_with_stats(
+        update, 'past_day', "Yesterday's Progress Report", "Date", date_str, "Yesterday",
+        empty_header=f"📊 *Yesterday's Progress Report*\n🗓️ *Date:* {escape_md(date_str)}",
+        targets_heading="Daily Targets (for reference)",
+        empty_message="You didn't solve any new problems yesterday. 📅",
+        plain_empty_message=f"You didn't solve any new problems on {date_str}. 📅",
     )
-    
-    await update.message.reply_text(summary_message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
 
 async def past_week_stats_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Replies with last week's stats."""
-    stats = get_past_week_stats_from_db()
-    summary_details, grand_total = _format_summary_message(stats, 'weekly')
-
-    # Calculate last week's date range (Monday to Sunday)
-    current_date = datetime.now()
-    days_since_monday = current_date.weekday()
-    start_of_current_week = current_date - timedelta(days=days_since_monday)
-    start_of_last_week = start_of_current_week - timedelta(days=7)
-    end_of_last_week = start_of_current_week - timedelta(days=1)
-    week_range = f"{start_of_last_week.strftime('%b %d')} - {end_of_last_week.strftime('%b %d, %Y')}"
-
-    if grand_total == 0:
-        # Check if there are weekly targets set for reference
-        targets = get_leetcode_target('weekly')
-        if targets['easy'] > 0 or targets['medium'] > 0 or targets['hard'] > 0:
-            target_summary = (
-                f"📊 *Last Week's Progress Report*\n"
-                f"🗓️ *Period:* {week_range}\n"
-                f"🎯 *Weekly Targets (for reference):*\n"
-                f"🟢 Easy: {_format_progress_bar(0, targets['easy'])}\n"
-                f"🟡 Medium: {_format_progress_bar(0, targets['medium'])}\n"
-                f"🔴 Hard: {_format_progress_bar(0, targets['hard'])}\n\n"
-                f"You didn't solve any new problems last week. 📅"
-            )
-            await update.message.reply_text(target_summary, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
-        else:
-            summary_message = f"You didn't solve any new problems last week ({week_range}). 📅"
-            await update.message.reply_text(summary_message, disable_web_page_preview=True)
-        return
-
-    summary_message = (
-        f"📊 *Last Week's Progress Report*\n"
-        f"🗓️ *Period:* {week_range}\n"
-        f"🚀 *Progress Overview*\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"{summary_details}\n\n"
-        f"━━━━━━━━━━━━━━━\n\n"
-        f"🎯 *Grand Total Solved Last Week:* {grand_total}"
+    week_range = _format_week_range(weeks_ago=1)
+    await _reply_with_stats(
+        update, 'past_week', "Last Week's Progress Report", "Period", week_range, "Last Week",
+        empty_header=f"📊 *Last Week's Progress Report*\n🗓️ *Period:* {escape_md(week_range)}",
+        targets_heading="Weekly Targets (for reference)",
+        empty_message="You didn't solve any new problems last week. 📅",
+        plain_empty_message=f"You didn't solve any new problems last week ({week_range}). 📅",
     )
-    
-    await update.message.reply_text(summary_message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
 
 async def ping_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Replies with a pong message."""
     await update.message.reply_text("Pong!")
 
 
-async def set_daily_target_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Sets daily LeetCode targets. Usage: /dset <easy> <medium> <hard>"""
+# Per target type: command, usage example, period unit, and the flair lines for the reply and the channel post (MarkdownV2)
+_TARGET_COMMANDS = {
+    'daily': (
+        "/dset", "`/dset 2 1 0` \\(2 easy, 1 medium, 0 hard per day\\)", "day",
+        "Good luck crushing your daily goals\\! 💪", "Let's achieve these goals every day\\! 🚀",
+    ),
+    'weekly': (
+        "/wset", "`/wset 10 5 2` \\(10 easy, 5 medium, 2 hard per week\\)", "week",
+        "Time to dominate this week\\! 🔥", "Let's smash these weekly goals\\! 💥",
+    ),
+    'monthly': (
+        "/mset", "`/mset 40 20 8` \\(40 easy, 20 medium, 8 hard per month\\)", "month",
+        "Ready to conquer this month\\! 🏆", "Let's achieve greatness this month\\! 🌟",
+    ),
+}
+
+
+async def _set_target(update: Update, context: ContextTypes.DEFAULT_TYPE, target_type: str):
+    """Parses `<easy> <medium> <hard>`, stores the target and announces it in the channel."""
+    command, example, unit, reply_flair, channel_flair = _TARGET_COMMANDS[target_type]
+    title = target_type.capitalize()
     if len(context.args) != 3:
         await update.message.reply_text(
-            "❌ *Usage:* `/dset <easy> <medium> <hard>`\n"
-            "Example: `/dset 2 1 0` (2 easy, 1 medium, 0 hard per day)",
-            parse_mode=ParseMode.MARKDOWN
+            f"❌ *Usage:* `{command} <easy> <medium> <hard>`\n"
+            f"Example: {example}",
+            **SEND_KW
         )
         return
     
@@ -522,159 +481,69 @@ async def set_daily_target_handler(update: Update, context: ContextTypes.DEFAULT
             await update.message.reply_text("❌ All target values must be non-negative integers.")
             return
         
-        success = set_leetcode_target('daily', easy, medium, hard)
+        success = await asyncio.to_thread(set_leetcode_target, target_type, easy, medium, hard)
         
         if success:
             # Send confirmation to user
             await update.message.reply_text(
-                f"✅ *Daily LeetCode Target Set!*\n\n"
-                f"🟢 *Easy:* {easy} problems/day\n"
-                f"🟡 *Medium:* {medium} problems/day\n"
-                f"🔴 *Hard:* {hard} problems/day\n\n"
-                f"Good luck crushing your daily goals! 💪",
-                parse_mode=ParseMode.MARKDOWN
+                f"✅ *{title} LeetCode Target Set\\!*\n\n"
+                f"🟢 *Easy:* {easy} problems/{unit}\n"
+                f"🟡 *Medium:* {medium} problems/{unit}\n"
+                f"🔴 *Hard:* {hard} problems/{unit}\n\n"
+                f"{reply_flair}",
+                **SEND_KW
             )
             
             # Send notification to channel
             channel_message = (
-                f"🎯 *New Daily Target Set!*\n\n"
-                f"📊 *LeetCode Daily Goals:*\n"
+                f"🎯 *New {title} Target Set\\!*\n\n"
+                f"📊 *LeetCode {title} Goals:*\n"
                 f"🟢 Easy: {easy} problems\n"
                 f"🟡 Medium: {medium} problems\n"
                 f"🔴 Hard: {hard} problems\n\n"
-                f"Let's achieve these goals every day! 🚀"
+                f"{channel_flair}"
             )
             await context.bot.send_message(
                 config.CHANNEL_ID, 
                 channel_message, 
-                disable_web_page_preview=True, 
-                parse_mode=ParseMode.MARKDOWN
+                **SEND_KW
             )
         else:
-            await update.message.reply_text("❌ Failed to set daily target. Please try again.")
+            await update.message.reply_text(f"❌ Failed to set {target_type} target. Please try again.")
             
     except ValueError:
         await update.message.reply_text("❌ All arguments must be valid integers.")
 
 
+async def set_daily_target_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Sets daily LeetCode targets. Usage: /dset <easy> <medium> <hard>"""
+    await _set_target(update, context, 'daily')
+
+
 async def set_weekly_target_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Sets weekly LeetCode targets. Usage: /wset <easy> <medium> <hard>"""
-    if len(context.args) != 3:
-        await update.message.reply_text(
-            "❌ *Usage:* `/wset <easy> <medium> <hard>`\n"
-            "Example: `/wset 10 5 2` (10 easy, 5 medium, 2 hard per week)",
-            parse_mode=ParseMode.MARKDOWN
-        )
-        return
-    
-    try:
-        easy = int(context.args[0])
-        medium = int(context.args[1])
-        hard = int(context.args[2])
-        
-        if easy < 0 or medium < 0 or hard < 0:
-            await update.message.reply_text("❌ All target values must be non-negative integers.")
-            return
-        
-        success = set_leetcode_target('weekly', easy, medium, hard)
-        
-        if success:
-            # Send confirmation to user
-            await update.message.reply_text(
-                f"✅ *Weekly LeetCode Target Set!*\n\n"
-                f"🟢 *Easy:* {easy} problems/week\n"
-                f"🟡 *Medium:* {medium} problems/week\n"
-                f"🔴 *Hard:* {hard} problems/week\n\n"
-                f"Time to dominate this week! 🔥",
-                parse_mode=ParseMode.MARKDOWN
-            )
-            
-            # Send notification to channel
-            channel_message = (
-                f"🎯 *New Weekly Target Set!*\n\n"
-                f"📊 *LeetCode Weekly Goals:*\n"
-                f"🟢 Easy: {easy} problems\n"
-                f"🟡 Medium: {medium} problems\n"
-                f"🔴 Hard: {hard} problems\n\n"
-                f"Let's smash these weekly goals! 💥"
-            )
-            await context.bot.send_message(
-                config.CHANNEL_ID, 
-                channel_message, 
-                disable_web_page_preview=True, 
-                parse_mode=ParseMode.MARKDOWN
-            )
-        else:
-            await update.message.reply_text("❌ Failed to set weekly target. Please try again.")
-            
-    except ValueError:
-        await update.message.reply_text("❌ All arguments must be valid integers.")
+    await _set_target(update, context, 'weekly')
 
 
 async def set_monthly_target_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Sets monthly LeetCode targets. Usage: /mset <easy> <medium> <hard>"""
-    if len(context.args) != 3:
-        await update.message.reply_text(
-            "❌ *Usage:* `/mset <easy> <medium> <hard>`\n"
-            "Example: `/mset 40 20 8` (40 easy, 20 medium, 8 hard per month)",
-            parse_mode=ParseMode.MARKDOWN
-        )
-        return
-    
-    try:
-        easy = int(context.args[0])
-        medium = int(context.args[1])
-        hard = int(context.args[2])
-        
-        if easy < 0 or medium < 0 or hard < 0:
-            await update.message.reply_text("❌ All target values must be non-negative integers.")
-            return
-        
-        success = set_leetcode_target('monthly', easy, medium, hard)
-        
-        if success:
-            # Send confirmation to user
-            await update.message.reply_text(
-                f"✅ *Monthly LeetCode Target Set!*\n\n"
-                f"🟢 *Easy:* {easy} problems/month\n"
-                f"🟡 *Medium:* {medium} problems/month\n"
-                f"🔴 *Hard:* {hard} problems/month\n\n"
-                f"Ready to conquer this month! 🏆",
-                parse_mode=ParseMode.MARKDOWN
-            )
-            
-            # Send notification to channel
-            channel_message = (
-                f"🎯 *New Monthly Target Set!*\n\n"
-                f"📊 *LeetCode Monthly Goals:*\n"
-                f"🟢 Easy: {easy} problems\n"
-                f"🟡 Medium: {medium} problems\n"
-                f"🔴 Hard: {hard} problems\n\n"
-                f"Let's achieve greatness this month! 🌟"
-            )
-            await context.bot.send_message(
-                config.CHANNEL_ID, 
-                channel_message, 
-                disable_web_page_preview=True, 
-                parse_mode=ParseMode.MARKDOWN
-            )
-        else:
-            await update.message.reply_text("❌ Failed to set monthly target. Please try again.")
-            
-    except ValueError:
-        await update.message.reply_text("❌ All arguments must be valid integers.")
+    await _set_target(update, context, 'monthly')
 
 def register_handlers(app: Application):
     """Registers all the message handlers for the bot."""
-    app.add_handler(CommandHandler("ping", ping_handler, filters=filters.ChatType.PRIVATE))
-    app.add_handler(CommandHandler("stats", stats_handler, filters=filters.ChatType.PRIVATE))
-    app.add_handler(CommandHandler("mstats", monthly_stats_handler, filters=filters.ChatType.PRIVATE))
-    app.add_handler(CommandHandler("wstats", weekly_stats_handler, filters=filters.ChatType.PRIVATE))
-    app.add_handler(CommandHandler("pstats", past_day_stats_handler, filters=filters.ChatType.PRIVATE))
-    app.add_handler(CommandHandler("pwstats", past_week_stats_handler, filters=filters.ChatType.PRIVATE))
-    app.add_handler(CommandHandler("dset", set_daily_target_handler, filters=filters.ChatType.PRIVATE))
-    app.add_handler(CommandHandler("wset", set_weekly_target_handler, filters=filters.ChatType.PRIVATE))
-    app.add_handler(CommandHandler("mset", set_monthly_target_handler, filters=filters.ChatType.PRIVATE))
+    private = filters.ChatType.PRIVATE
+    commands = (
+        ("ping", ping_handler),
+        ("stats", stats_handler),
+        ("mstats", monthly_stats_handler),
+        ("wstats", weekly_stats_handler),
+        ("pstats", past_day_stats_handler),
+        ("pwstats", past_week_stats_handler),
+        ("dset", set_daily_target_handler),
+        ("wset", set_weekly_target_handler),
+        ("mset", set_monthly_target_handler),
+    )
+    app.add_handlers([CommandHandler(name, callback, filters=private, block=False) for name, callback in commands])
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Logs the error and provides a specific message for conflict errors."""
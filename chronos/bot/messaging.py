@@ -1,5 +1,21 @@
 from typing import Optional
 
+from telegram.constants import ParseMode, MessageEntityType
+from telegram.helpers import escape_markdown
+
+# Keyword arguments shared by every Markdown message the bot posts
+SEND_KW = {"disable_web_page_preview": True, "parse_mode": ParseMode.MARKDOWN_V2}
+
+# Backslash-escapes every MarkdownV2 special character in one str.translate pass
+_MDV2_ESCAPE = str.maketrans({c: "\\" + c for c in "\\_*[]()~`>#+-=|{}.!"})
+
+def escape_md(text) -> str:
+    """Escapes a variable field for MarkdownV2 message text. Link URLs and code blocks need escape_markdown's entity modes."""
+    return str(text).translate(_MDV2_ESCAPE)
+
+_HEADER = "👾 *New Solve*"
+_TEST_HEADER = "👾 *\\[TEST\\] Latest Submission* 👾"
+
 def format_new_solve_message(
     platform: str,
     problem_name: str,
@@ -9,35 +25,42 @@ def format_new_solve_message(
     runtime: Optional[str],
     memory: Optional[str],
     code: Optional[str] = None,
-    language_ext: Optional[str] = None
+    language_ext: Optional[str] = None,
+    test: bool = False,
+    verdict: Optional[str] = None,
+    note: Optional[str] = None
 ) -> str:
 
-    if platform.lower() == "leetcode":
-        if difficulty == "Easy":
-            difficulty_str = f"{difficulty}"
-        elif difficulty == "Medium":
-            difficulty_str = f"{difficulty}"
-        elif difficulty == "Hard":
-            difficulty_str = f"{difficulty}"
-        else:
-            difficulty_str = f"{difficulty or 'N/A'}"
-    else: # Codeforces
-        difficulty_str = f"{difficulty or 'N/A'}"
-
-    message = (
-        f"👾 *New Solve*\n\n"
-        f"⚔️ *Platform:* {platform}\n"
-        f"📘 *Problem:* [{problem_name}]({problem_url})\n"
+    difficulty_str = escape_md(difficulty or 'N/A')
+    problem_link = (
+        f"[{escape_md(problem_name)}]"
+        f"({escape_markdown(problem_url, version=2, entity_type=MessageEntityType.TEXT_LINK)})"
+    )
+
+    parts = [
+        f"{_TEST_HEADER if test else _HEADER}\n\n"
+        f"⚔️ *Platform:* {escape_md(platform)}\n"
+        f"📘 *Problem:* {problem_link}\n"
+    ]
+
+    # Test posts show whatever the latest submission was, so they say whether it was accepted
+    if verdict:
+        parts.append(f"🧾 *Verdict:* {escape_md(verdict)}\n")
+
+    parts.append(
         f"🏷️ *Difficulty:* {difficulty_str}\n"
-        f"💻 *Language:* {language}\n"
+        f"💻 *Language:* {escape_md(language)}\n"
     )
 
     if runtime:
-        message += f"⚡ *Runtime:* {runtime}\n"
+        parts.append(f"⚡ *Runtime:* {escape_md(runtime)}\n")
     if memory:
-        message += f"🧠 *Memory:* {memory}\n"
+        parts.append(f"🧠 *Memory:* {escape_md(memory)}\n")
+    if note:
+        parts.append(f"_{escape_md(note)}_\n")
 
     if code and language_ext:
-        message += f"\n💡 *Solution:*\n```{language_ext}\n{code}\n```"
+        code = escape_markdown(code, version=2, entity_type=MessageEntityType.PRE)
+        parts.append(f"\n💡 *Solution:*\n```{language_ext}\n{code}\n```")
         
-    return message 
+    return "".join(parts) 
@@ -10,45 +10,68 @@ def init_db():
     """Initializes the database and creates tables if they don't exist."""
     db_service.init_db()
 
-def log_problem_solved(platform: str, problem_id: str, rating: str) -> bool:
+def transaction():
+    """
+    Opens a session that commits on exit. Pass it as `session` to the write helpers
+    below to group several writes into one transaction; they then raise database errors
+    instead of returning False, and the whole transaction rolls back.
+    """
+    return db_service.get_session()
+
+def log_problem_solved(platform: str, problem_id: str, rating: str, session=None) -> bool:
     """
     Logs a newly solved problem if it's the first time ever for this user.
     Returns True if it's a new unique solve, False otherwise.
     """
-    return db_service.log_problem_solved(platform, problem_id, rating)
+    return db_service.log_problem_solved(platform, problem_id, rating, session)
+
+def log_problems_solved(rows, session=None):
+    """
+    Logs a batch of (platform, problem_id, rating) solves in one round-trip.
+    Returns the (platform, problem_id) keys that were new all-time unique solves.
+    """
+    return db_service.log_problems_solved(rows, session)
 
-def get_daily_stats_from_db():
+def get_daily_stats_from_db(as_of=None):
     """Gets the count of unique problems first solved today, grouped by platform and rating."""
-    return db_service.get_daily_stats()
+    return db_service.get_daily_stats(as_of)
 
-def get_monthly_stats_from_db():
+def get_monthly_stats_from_db(as_of=None):
     """Gets the count of unique problems first solved in the current month, grouped by platform and rating."""
-    return db_service.get_monthly_stats()
+    return db_service.get_monthly_stats(as_of)
 
-def get_weekly_stats_from_db():
+def get_weekly_stats_from_db(as_of=None):
     """Gets the count of unique problems first solved in the current week (Monday to Sunday), grouped by platform and rating."""
-    return db_service.get_weekly_stats()
+    return db_service.get_weekly_stats(as_of)
 
-def get_past_day_stats_from_db():
+def get_all_stats_from_db(as_of=None):
+    """Gets the daily, weekly and monthly stats in a single query, keyed by 'daily', 'weekly' and 'monthly'."""
+    return db_service.get_all_stats(as_of)
+
+def get_past_day_stats_from_db(as_of=None):
     """Gets the count of unique problems first solved yesterday, grouped by platform and rating."""
-    return db_service.get_past_day_stats()
+    return db_service.get_past_day_stats(as_of)
 
-def get_past_week_stats_from_db():
+def get_past_week_stats_from_db(as_of=None):
     """Gets the count of unique problems first solved in the previous week (Monday to Sunday), grouped by platform and rating."""
-    return db_service.get_past_week_stats()
+    return db_service.get_past_week_stats(as_of)
+
+def get_stats_version() -> int:
+    """Gets a counter that changes whenever a new solve or target is recorded."""
+    return db_service.stats_version
 
 def get_value(key: str, default: str = None) -> str:
     """Gets a value from the key-value store."""
     return db_service.get_value(key, default)
 
-def set_value(key: str, value: str):
+def set_value(key: str, value: str, session=None):
     """Sets a value in the key-value store."""
-    db_service.set_value(key, value)
+    db_service.set_value(key, value, session)
 
 
-def set_leetcode_target(target_type: str, easy: int, medium: int, hard: int) -> bool:
+def set_leetcode_target(target_type: str, easy: int, medium: int, hard: int, session=None) -> bool:
     """Sets LeetCode targets for daily, weekly, or monthly."""
-    return db_service.set_leetcode_target(target_type, easy, medium, hard)
+    return db_service.set_leetcode_target(target_type, easy, medium, hard, session)
 
 
 def get_leetcode_target(target_type: str) -> dict:
@@ -1,18 +1,40 @@
 """ORM-based database operations using SQLAlchemy."""
 
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, Optional, List
-import pytz
+import threading
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, List, Tuple
+from zoneinfo import ZoneInfo
 from contextlib import contextmanager
 
-from sqlalchemy import create_engine, func, and_
+from sqlalchemy import create_engine, event, func, and_, case, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 from .models import Base, SolvedProblem, KeyValueStore, LeetCodeTarget
 from ..config import settings as config
 
+_TZ = ZoneInfo(config.TIMEZONE)
+
+_VALID_TARGET_TYPES = frozenset({'daily', 'weekly', 'monthly'})
+
+
+def _run_after_commit(session: Session):
+    """Runs the cache updates queued by writes once the session's outer transaction commits."""
+    # Releasing a savepoint also fires after_commit, but nothing is durable until the outer transaction commits
+    if not session.in_nested_transaction():
+        for callback in session.info.pop('after_commit', ()):
+            callback()
+
+
+def _drop_after_commit(session: Session):
+    """Discards queued cache updates when the outer transaction rolls back."""
+    if not session.in_nested_transaction():
+        session.info.pop('after_commit', None)
+
 
 class DatabaseService:
     """Service class for database operations using SQLAlchemy ORM."""
@@ -21,305 +43,388 @@ class DatabaseService:
         if not config.DATABASE_URL:
             raise ValueError("DATABASE_URL is not set in the environment.")
         
-        self.engine = create_engine(config.DATABASE_URL, echo=False)
+        # A small pool is plenty for one bot process; pre-ping and recycle replace connections the server has dropped while idle
+        self.engine = create_engine(
+            config.DATABASE_URL,
+            echo=False,
+            pool_size=5,
+            max_overflow=10,
+            pool_timeout=30,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+        )
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        # Dialect insert construct, for the ON CONFLICT clauses that the generic insert lacks
+        self._insert = postgresql.insert if self.engine.dialect.name == 'postgresql' else sqlite.insert
+        event.listen(self.SessionLocal, "after_commit", _run_after_commit)
+        event.listen(self.SessionLocal, "after_rollback", _drop_after_commit)
+        # Reads are single SELECTs, so they run in autocommit on the same pool and skip the BEGIN/ROLLBACK pair
+        self.ReadSessionLocal = sessionmaker(
+            autoflush=False,
+            bind=self.engine.execution_options(isolation_level="AUTOCOMMIT"),
+        )
+        # Bumped whenever solves or targets change so callers can tell when cached stats are stale
+        self.stats_version = 0
+        # Commit callbacks run on the writers' worker threads, so the increment is guarded to not lose a bump
+        self._version_lock = threading.Lock()
+        # Targets change only through set_leetcode_target, so reads are served from memory after the first query
+        self._target_cache: Dict[str, Dict[str, int]] = {}
+        # Write-through cache for the key-value store; the lock keeps it consistent when called from worker threads
+        self._kv_cache: Dict[str, str] = {}
+        self._kv_lock = threading.Lock()
+        # Set once init_db has loaded the whole table, after which a cache miss means the key does not exist
+        self._kv_loaded = False
     
     @contextmanager
-    def get_session(self) -> Session:
-        """Get a database session with automatic cleanup."""
-        session = self.SessionLocal()
+    def get_session(self, read_only: bool = False) -> Session:
+        """Get a database session with automatic cleanup. Read-only sessions run in autocommit mode."""
+        session = self.ReadSessionLocal() if read_only else self.SessionLocal()
         try:
             yield session
             session.commit()
         except Exception as e:
             session.rollback()
-            logging.error(f"Database session error: {e}")
+            logging.error("Database session error: %s", e)
             raise
         finally:
             session.close()
     
+    @contextmanager
+    def _write_scope(self, session: Optional[Session]):
+        """Yields (session, owned): the caller's session if one was passed, otherwise a new one committed on exit."""
+        if session is not None:
+            yield session, False
+        else:
+            with self.get_session() as own_session:
+                yield own_session, True
+    
+    @staticmethod
+    def _after_commit(session: Session, callback):
+        """Queues callback to run once the session's outer transaction commits; it is dropped on rollback."""
+        session.info.setdefault('after_commit', []).append(callback)
+    
     def init_db(self):
         """Initialize the database and create tables."""
         try:
-            Base.metadata.create_all(bind=self.engine)
-            logging.info("Database initialized successfully with ORM.")
+            # All schema setup shares one connection and one transaction
+            with self.engine.begin() as conn:
+                Base.metadata.create_all(bind=conn)
+                # create_all skips tables that already exist, so add indexes introduced after the table was created.
+                # IF NOT EXISTS makes this one idempotent statement instead of a catalog lookup followed by the DDL.
+                for index in SolvedProblem.__table__.indexes:
+                    conn.execute(CreateIndex(index, if_not_exists=True))
+                # The key-value store is a handful of poll cursors, so load it whole and serve reads from memory
+                kv_pairs = conn.execute(select(KeyValueStore.key, KeyValueStore.value)).all()
+            with self._kv_lock:
+                for key, value in kv_pairs:
+                    self._kv_cache.setdefault(key, value)
+                self._kv_loaded = True
+            logging.info("Database initialized successfully with ORM. Pool: %s", self.engine.pool.status())
         except SQLAlchemyError as e:
-            logging.error(f"Error initializing database: {e}")
+            logging.error("Error initializing database: %s", e)
             raise
     
-    def log_problem_solved(self, platform: str, problem_id: str, rating: str) -> bool:
+    def log_problem_solved(self, platform: str, problem_id: str, rating: str, session: Optional[Session] = None) -> bool:
         """
         Log a newly solved problem if it's the first time ever for this user.
         Returns True if it's a new unique solve, False otherwise.
+        Pass a session to make the insert part of the caller's transaction; database errors are then re-raised.
         """
-        solve_date = datetime.now(pytz.timezone(config.TIMEZONE)).date()
-        
-        with self.get_session() as session:
-            try:
-                # Check if the problem already exists
-                existing = session.query(SolvedProblem).filter(
-                    and_(
-                        SolvedProblem.platform == platform,
-                        SolvedProblem.problem_id == problem_id
-                    )
-                ).first()
-                
-                if existing:
+        # Most solves are new, so a plain INSERT skips the conflict check and only the rare repeat pays for the rollback
+        new_solve = SolvedProblem(
+            platform=platform,
+            problem_id=problem_id,
+            first_solve_date=datetime.now(_TZ).date(),
+            rating=str(rating)
+        )
+        caller_session = session is not None
+        try:
+            with self._write_scope(session) as (session, owned):
+                try:
+                    if owned:
+                        session.add(new_solve)
+                        session.flush()
+                    else:
+                        # A savepoint keeps a duplicate from rolling back the caller's other work
+                        with session.begin_nested():
+                            session.add(new_solve)
+                except IntegrityError:
+                    if owned:
+                        session.rollback()
                     return False  # Already solved before
                 
-                # Create new solved problem record
-                new_solve = SolvedProblem(
-                    platform=platform,
-                    problem_id=problem_id,
-                    first_solve_date=solve_date,
-                    rating=str(rating)
-                )
-                session.add(new_solve)
-                session.commit()
-                
-                logging.info(f"Logged new ALL-TIME unique solve: {platform} - {problem_id}")
-                return True
-                
-            except SQLAlchemyError as e:
-                logging.error(f"Error logging solved problem: {e}")
-                return False
+                self._after_commit(session, self._bump_stats_version)
+        except SQLAlchemyError as e:
+            logging.error("Error logging solved problem: %s", e)
+            if caller_session:
+                raise
+            return False
+        
+        logging.info("Logged new ALL-TIME unique solve: %s - %s", platform, problem_id)
+        return True
     
-    def get_daily_stats(self) -> Dict[str, Dict[str, int]]:
-        """Get the count of unique problems first solved today, grouped by platform and rating."""
-        solve_date = datetime.now(pytz.timezone(config.TIMEZONE)).date()
-        stats = {}
+    def log_problems_solved(self, rows: List[Tuple[str, str, str]], session: Optional[Session] = None) -> List[Tuple[str, str]]:
+        """
+        Log a batch of (platform, problem_id, rating) solves in a single INSERT.
+        Returns the (platform, problem_id) keys that were new all-time unique solves.
+        Pass a session to make the insert part of the caller's transaction; database errors are then re-raised.
+        """
+        if not rows:
+            return []
         
-        with self.get_session() as session:
-            try:
-                results = session.query(
-                    SolvedProblem.platform,
-                    SolvedProblem.rating,
-                    func.count(SolvedProblem.problem_id).label('count')
-                ).filter(
-                    SolvedProblem.first_solve_date == solve_date
-                ).group_by(
-                    SolvedProblem.platform,
-                    SolvedProblem.rating
-                ).all()
-                
-                for platform, rating, count in results:
-                    if platform not in stats:
-                        stats[platform] = {}
-                    stats[platform][rating] = count
-                    
-            except SQLAlchemyError as e:
-                logging.error(f"Error getting daily stats: {e}")
+        solve_date = datetime.now(_TZ).date()
+        values = [
+            {'platform': platform, 'problem_id': problem_id, 'first_solve_date': solve_date, 'rating': str(rating)}
+            for platform, problem_id, rating in rows
+        ]
+        stmt = (
+            self._insert(SolvedProblem)
+            .values(values)
+            .on_conflict_do_nothing(index_elements=['platform', 'problem_id'])
+            .returning(SolvedProblem.platform, SolvedProblem.problem_id)
+        )
         
-        return stats
+        caller_session = session is not None
+        try:
+            with self._write_scope(session) as (session, _):
+                inserted = [tuple(row) for row in session.execute(stmt)]
+                if inserted:
+                    self._after_commit(session, self._bump_stats_version)
+        except SQLAlchemyError as e:
+            logging.error("Error logging solved problems: %s", e)
+            if caller_session:
+                raise
+            return []
+        
+        for platform, problem_id in inserted:
+            logging.info("Logged new ALL-TIME unique solve: %s - %s", platform, problem_id)
+        return inserted
     
-    def get_monthly_stats(self) -> Dict[str, Dict[str, int]]:
-        """Get the count of unique problems first solved in the current month, grouped by platform and rating."""
-        current_date = datetime.now(pytz.timezone(config.TIMEZONE))
-        first_day_of_month = current_date.replace(day=1).date()
-        stats = {}
+    def _collect_stats(self, condition, label: str) -> Dict[str, Dict[str, int]]:
+        """Count unique problems matching a first_solve_date condition, grouped by platform and rating."""
+        stats = defaultdict(dict)
         
-        with self.get_session() as session:
+        with self.get_session(read_only=True) as session:
             try:
                 results = session.query(
                     SolvedProblem.platform,
                     SolvedProblem.rating,
-                    func.count(SolvedProblem.problem_id).label('count')
+                    func.count().label('count')
                 ).filter(
-                    SolvedProblem.first_solve_date >= first_day_of_month
+                    condition
                 ).group_by(
                     SolvedProblem.platform,
                     SolvedProblem.rating
-                ).all()
+                )
                 
                 for platform, rating, count in results:
-                    if platform not in stats:
-                        stats[platform] = {}
                     stats[platform][rating] = count
                     
             except SQLAlchemyError as e:
-                logging.error(f"Error getting monthly stats: {e}")
+                logging.error("Error getting %s stats: %s", label, e)
+                return {}
         
-        return stats
+        return dict(stats)
     
-    def get_weekly_stats(self) -> Dict[str, Dict[str, int]]:
+    # The stats methods below take an optional `as_of` day (default: today in the configured time zone),
+    # so a caller can compute the day once and get results consistent with it.
+    
+    def get_daily_stats(self, as_of: Optional[date] = None) -> Dict[str, Dict[str, int]]:
+        """Get the count of unique problems first solved today, grouped by platform and rating."""
+        today = as_of or datetime.now(_TZ).date()
+        return self._collect_stats(SolvedProblem.first_solve_date == today, "daily")
+    
+    def get_monthly_stats(self, as_of: Optional[date] = None) -> Dict[str, Dict[str, int]]:
+        """Get the count of unique problems first solved in the current month, grouped by platform and rating."""
+        today = as_of or datetime.now(_TZ).date()
+        first_day_of_month = today.replace(day=1)
+        return self._collect_stats(SolvedProblem.first_solve_date >= first_day_of_month, "monthly")
+    
+    def get_weekly_stats(self, as_of: Optional[date] = None) -> Dict[str, Dict[str, int]]:
         """Get the count of unique problems first solved in the current week (Monday to Sunday), grouped by platform and rating."""
-        current_date = datetime.now(pytz.timezone(config.TIMEZONE))
+        today = as_of or datetime.now(_TZ).date()
         # Calculate the start of the current week (Monday)
-        days_since_monday = current_date.weekday()  # Monday is 0, Sunday is 6
-        start_of_week = (current_date - timedelta(days=days_since_monday)).date()
-        stats = {}
+        start_of_week = today - timedelta(days=today.weekday())  # Monday is 0, Sunday is 6
+        return self._collect_stats(SolvedProblem.first_solve_date >= start_of_week, "weekly")
+    
+    def get_all_stats(self, as_of: Optional[date] = None) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """
+        Get the daily, weekly and monthly stats in one query, keyed by period.
+        Each period matches what get_daily_stats, get_weekly_stats and get_monthly_stats return.
+        """
+        today = as_of or datetime.now(_TZ).date()
+        start_of_week = today - timedelta(days=today.weekday())
+        first_day_of_month = today.replace(day=1)
+        all_stats = {'daily': defaultdict(dict), 'weekly': defaultdict(dict), 'monthly': defaultdict(dict)}
         
-        with self.get_session() as session:
+        with self.get_session(read_only=True) as session:
             try:
+                # The week can start in the previous month, so scan from whichever window opens first
+                # and count each window with a conditional sum in the same pass
                 results = session.query(
                     SolvedProblem.platform,
                     SolvedProblem.rating,
-                    func.count(SolvedProblem.problem_id).label('count')
+                    func.sum(case((SolvedProblem.first_solve_date == today, 1), else_=0)).label('daily'),
+                    func.sum(case((SolvedProblem.first_solve_date >= start_of_week, 1), else_=0)).label('weekly'),
+                    func.sum(case((SolvedProblem.first_solve_date >= first_day_of_month, 1), else_=0)).label('monthly')
                 ).filter(
-                    SolvedProblem.first_solve_date >= start_of_week
+                    SolvedProblem.first_solve_date >= min(start_of_week, first_day_of_month)
                 ).group_by(
                     SolvedProblem.platform,
                     SolvedProblem.rating
-                ).all()
+                )
                 
-                for platform, rating, count in results:
-                    if platform not in stats:
-                        stats[platform] = {}
-                    stats[platform][rating] = count
+                for platform, rating, *counts in results:
+                    for period, count in zip(('daily', 'weekly', 'monthly'), counts):
+                        if count:
+                            all_stats[period][platform][rating] = count
                     
             except SQLAlchemyError as e:
-                logging.error(f"Error getting weekly stats: {e}")
+                logging.error("Error getting period stats: %s", e)
+                return {'daily': {}, 'weekly': {}, 'monthly': {}}
         
-        return stats
+        return {period: dict(stats) for period, stats in all_stats.items()}
     
-    def get_past_day_stats(self) -> Dict[str, Dict[str, int]]:
+    def get_past_day_stats(self, as_of: Optional[date] = None) -> Dict[str, Dict[str, int]]:
         """Get the count of unique problems first solved yesterday, grouped by platform and rating."""
-        current_date = datetime.now(pytz.timezone(config.TIMEZONE))
-        yesterday = (current_date - timedelta(days=1)).date()
-        stats = {}
-        
-        with self.get_session() as session:
-            try:
-                results = session.query(
-                    SolvedProblem.platform,
-                    SolvedProblem.rating,
-                    func.count(SolvedProblem.problem_id).label('count')
-                ).filter(
-                    SolvedProblem.first_solve_date == yesterday
-                ).group_by(
-                    SolvedProblem.platform,
-                    SolvedProblem.rating
-                ).all()
-                
-                for platform, rating, count in results:
-                    if platform not in stats:
-                        stats[platform] = {}
-                    stats[platform][rating] = count
-                    
-            except SQLAlchemyError as e:
-                logging.error(f"Error getting past day stats: {e}")
-        
-        return stats
+        today = as_of or datetime.now(_TZ).date()
+        yesterday = today - timedelta(days=1)
+        return self._collect_stats(SolvedProblem.first_solve_date == yesterday, "past day")
     
-    def get_past_week_stats(self) -> Dict[str, Dict[str, int]]:
+    def get_past_week_stats(self, as_of: Optional[date] = None) -> Dict[str, Dict[str, int]]:
         """Get the count of unique problems first solved in the previous week (Monday to Sunday), grouped by platform and rating."""
-        current_date = datetime.now(pytz.timezone(config.TIMEZONE))
+        today = as_of or datetime.now(_TZ).date()
         # Calculate the start of the current week (Monday)
-        days_since_monday = current_date.weekday()  # Monday is 0, Sunday is 6
-        start_of_current_week = (current_date - timedelta(days=days_since_monday)).date()
+        start_of_current_week = today - timedelta(days=today.weekday())  # Monday is 0, Sunday is 6
         # Previous week is 7 days before current week
         start_of_previous_week = start_of_current_week - timedelta(days=7)
         end_of_previous_week = start_of_current_week - timedelta(days=1)
-        stats = {}
-        
-        with self.get_session() as session:
-            try:
-                results = session.query(
-                    SolvedProblem.platform,
-                    SolvedProblem.rating,
-                    func.count(SolvedProblem.problem_id).label('count')
-                ).filter(
-                    and_(
-                        SolvedProblem.first_solve_date >= start_of_previous_week,
-                        SolvedProblem.first_solve_date <= end_of_previous_week
-                    )
-                ).group_by(
-                    SolvedProblem.platform,
-                    SolvedProblem.rating
-                ).all()
-                
-                for platform, rating, count in results:
-                    if platform not in stats:
-                        stats[platform] = {}
-                    stats[platform][rating] = count
-                    
-            except SQLAlchemyError as e:
-                logging.error(f"Error getting past week stats: {e}")
-        
-        return stats
+        return self._collect_stats(
+            and_(
+                SolvedProblem.first_solve_date >= start_of_previous_week,
+                SolvedProblem.first_solve_date <= end_of_previous_week
+            ),
+            "past week"
+        )
+    
+    def _bump_stats_version(self):
+        with self._version_lock:
+            self.stats_version += 1
+    
+    def _cache_value(self, key: str, value: str):
+        with self._kv_lock:
+            self._kv_cache[key] = value
+    
+    def _target_changed(self, target_type: str):
+        with self._version_lock:
+            self._target_cache.pop(target_type, None)
+            self.stats_version += 1
     
     def get_value(self, key: str, default: Optional[str] = None) -> Optional[str]:
         """Get a value from the key-value store."""
-        with self.get_session() as session:
+        with self._kv_lock:
+            if key in self._kv_cache:
+                return self._kv_cache[key]
+            if self._kv_loaded:
+                return default
+        
+        with self.get_session(read_only=True) as session:
             try:
                 kv_pair = session.query(KeyValueStore).filter(KeyValueStore.key == key).first()
-                return kv_pair.value if kv_pair else default
+                if kv_pair is None:
+                    return default
+                with self._kv_lock:
+                    self._kv_cache.setdefault(key, kv_pair.value)
+                return kv_pair.value
             except SQLAlchemyError as e:
-                logging.error(f"Error getting value for key '{key}': {e}")
+                logging.error("Error getting value for key '%s': %s", key, e)
                 return default
     
-    def set_value(self, key: str, value: str) -> bool:
-        """Set a value in the key-value store."""
-        with self.get_session() as session:
-            try:
-                kv_pair = session.query(KeyValueStore).filter(KeyValueStore.key == key).first()
-                if kv_pair:
-                    kv_pair.value = str(value)
-                else:
-                    kv_pair = KeyValueStore(key=key, value=str(value))
-                    session.add(kv_pair)
-                
-                session.commit()
-                return True
-            except SQLAlchemyError as e:
-                logging.error(f"Error setting value for key '{key}': {e}")
-                return False
+    def set_value(self, key: str, value: str, session: Optional[Session] = None) -> bool:
+        """Set a value in the key-value store. Pass a session to make the write part of the caller's transaction; database errors are then re-raised."""
+        stmt = self._insert(KeyValueStore).values(key=key, value=str(value))
+        caller_session = session is not None
+        try:
+            with self._write_scope(session) as (session, _):
+                session.execute(stmt.on_conflict_do_update(
+                    index_elements=['key'],
+                    set_={'value': stmt.excluded.value}
+                ))
+                self._after_commit(session, lambda: self._cache_value(key, str(value)))
+        except SQLAlchemyError as e:
+            logging.error("Error setting value for key '%s': %s", key, e)
+            if caller_session:
+                raise
+            return False
+        return True
     
-    def set_leetcode_target(self, target_type: str, easy: int, medium: int, hard: int) -> bool:
-        """Set LeetCode targets for daily, weekly, or monthly."""
-        if target_type not in ['daily', 'weekly', 'monthly']:
+    def set_leetcode_target(self, target_type: str, easy: int, medium: int, hard: int, session: Optional[Session] = None) -> bool:
+        """Set LeetCode targets for daily, weekly, or monthly. Pass a session to make the write part of the caller's transaction; database errors are then re-raised."""
+        if target_type not in _VALID_TARGET_TYPES:
             raise ValueError("target_type must be 'daily', 'weekly', or 'monthly'")
         
-        with self.get_session() as session:
-            try:
-                target = session.query(LeetCodeTarget).filter(
-                    LeetCodeTarget.target_type == target_type
-                ).first()
-                
-                if target:
-                    target.easy_target = easy
-                    target.medium_target = medium
-                    target.hard_target = hard
-                    target.updated_at = datetime.utcnow()
-                else:
-                    target = LeetCodeTarget(
-                        target_type=target_type,
-                        easy_target=easy,
-                        medium_target=medium,
-                        hard_target=hard
-                    )
-                    session.add(target)
-                
-                session.commit()
-                logging.info(f"Set {target_type} LeetCode target: Easy={easy}, Medium={medium}, Hard={hard}")
-                return True
-                
-            except SQLAlchemyError as e:
-                logging.error(f"Error setting {target_type} target: {e}")
-                return False
+        stmt = self._insert(LeetCodeTarget).values(
+            target_type=target_type,
+            easy_target=easy,
+            medium_target=medium,
+            hard_target=hard
+        )
+        # ON CONFLICT updates skip Column.onupdate, so updated_at is set here
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['target_type'],
+            set_={
+                'easy_target': stmt.excluded.easy_target,
+                'medium_target': stmt.excluded.medium_target,
+                'hard_target': stmt.excluded.hard_target,
+                'updated_at': func.now()
+            }
+        )
+        caller_session = session is not None
+        try:
+            with self._write_scope(session) as (session, _):
+                session.execute(stmt)
+                self._after_commit(session, lambda: self._target_changed(target_type))
+        except SQLAlchemyError as e:
+            logging.error("Error setting %s target: %s", target_type, e)
+            if caller_session:
+                raise
+            return False
+        
+        logging.info("Set %s LeetCode target: Easy=%s, Medium=%s, Hard=%s", target_type, easy, medium, hard)
+        return True
     
     def get_leetcode_target(self, target_type: str) -> Dict[str, int]:
         """Get LeetCode targets for daily, weekly, or monthly."""
-        if target_type not in ['daily', 'weekly', 'monthly']:
+        if target_type not in _VALID_TARGET_TYPES:
             raise ValueError("target_type must be 'daily', 'weekly', or 'monthly'")
         
-        with self.get_session() as session:
+        cached = self._target_cache.get(target_type)
+        if cached is not None:
+            return dict(cached)
+        
+        # A target committed while this query runs bumps the version, and the stale read is then not cached
+        version = self.stats_version
+        with self.get_session(read_only=True) as session:
             try:
                 target = session.query(LeetCodeTarget).filter(
                     LeetCodeTarget.target_type == target_type
                 ).first()
                 
                 if target:
-                    return {
+                    targets = {
                         'easy': target.easy_target,
                         'medium': target.medium_target,
                         'hard': target.hard_target
                     }
                 else:
-                    return {'easy': 0, 'medium': 0, 'hard': 0}
+                    targets = {'easy': 0, 'medium': 0, 'hard': 0}
+                with self._version_lock:
+                    if self.stats_version == version:
+                        self._target_cache[target_type] = targets
+                return dict(targets)
                     
             except SQLAlchemyError as e:
-                logging.error(f"Error getting {target_type} target: {e}")
+                logging.error("Error getting %s target: %s", target_type, e)
                 return {'easy': 0, 'medium': 0, 'hard': 0}
 
 
@@ -1,7 +1,6 @@
 """SQLAlchemy models for the database."""
 
-from datetime import datetime
-from sqlalchemy import Column, Integer, String, Date, DateTime, Text, CheckConstraint
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, CheckConstraint, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.dialects.postgresql import ENUM
 
@@ -17,6 +16,11 @@ class SolvedProblem(Base):
     first_solve_date = Column(Date, nullable=False)
     rating = Column(String)
     
+    __table_args__ = (
+        # Covers the stats queries: range filter on the date, grouped by platform and rating
+        Index('idx_solved_by_date', 'first_solve_date', 'platform', 'rating'),
+    )
+    
     def __repr__(self):
         return f"<SolvedProblem(platform='{self.platform}', problem_id='{self.problem_id}')>"
 
@@ -41,8 +45,9 @@ class LeetCodeTarget(Base):
     easy_target = Column(Integer, default=0)
     medium_target = Column(Integer, default=0)
     hard_target = Column(Integer, default=0)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # now() is rendered into the statement, so timestamps come from the database clock
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     
     __table_args__ = (
         CheckConstraint("target_type IN ('daily', 'weekly', 'monthly')", name='check_target_type'),
@@ -5,12 +5,12 @@ def get_last_submission_id():
     value = get_value(constants.LAST_CF_SUBMISSION_ID_KEY, "0")
     return int(value)
 
-def save_last_submission_id(submission_id):
-    set_value(constants.LAST_CF_SUBMISSION_ID_KEY, str(submission_id))
+def save_last_submission_id(submission_id, session=None):
+    set_value(constants.LAST_CF_SUBMISSION_ID_KEY, str(submission_id), session)
 
 def get_last_leetcode_timestamp():
     value = get_value(constants.LAST_LC_TIMESTAMP_KEY, "0")
     return int(value)
 
-def save_last_leetcode_timestamp(timestamp):
-    set_value(constants.LAST_LC_TIMESTAMP_KEY, str(timestamp)) 
\ No newline at end of file
+def save_last_leetcode_timestamp(timestamp, session=None):
+    set_value(constants.LAST_LC_TIMESTAMP_KEY, str(timestamp), session) 
\ No newline at end of file
@@ -12,4 +12,8 @@ from .leetcode import (
     get_leetcode_submission_details,
     get_leetcode_cookies,
     get_leetcode_headers
-) 
\ No newline at end of file
+)
+from .http_client import (
+    get_http_client,
+    close_http_client
+)
\ No newline at end of file
@@ -1,78 +1,84 @@
+import asyncio
 import hashlib
 import time
 import httpx
-import asyncio
 import logging
 
 from telegram.ext import ContextTypes
-from telegram.constants import ParseMode
 
 from ..config import settings as config
 from ..config import constants
-from ..data.database import log_problem_solved
+from ..data.database import log_problems_solved, transaction
 from ..data.state_manager import get_last_submission_id, save_last_submission_id
-from ..bot.messaging import format_new_solve_message
+from ..bot.messaging import format_new_solve_message, SEND_KW
+from .http_client import get_http_client
+
+# The parts of a user.status request that stay the same between calls
+_USER_STATUS_PARAMS = {
+    "handle": config.CF_HANDLE,
+    "from": 1,
+    "apiKey": config.CF_API_KEY,
+}
+
+# Fixed random prefix of apiSig, and the secret suffix encoded once rather than on every poll
+_SIG_RAND = "123456"
+_SIG_SUFFIX = f"#{config.CF_API_SECRET}".encode("utf-8")
 
 def generate_api_sig(method_name, **kwargs):
-    rand = "123456"
-    params = "&".join([f"{k}={v}" for k, v in sorted(kwargs.items())])
-    return hashlib.sha512(
-        f"{rand}/{method_name}?{params}#{config.CF_API_SECRET}".encode("utf-8")
-    ).hexdigest()
+    params = "&".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+    sig = hashlib.sha512(f"{_SIG_RAND}/{method_name}?{params}".encode("utf-8"))
+    sig.update(_SIG_SUFFIX)
+    return sig.hexdigest()
 
-def get_latest_submission_id():
+def build_user_status_params(count: int) -> dict:
+    """Builds signed query parameters for a user.status request returning the latest `count` submissions."""
+    params = _USER_STATUS_PARAMS | {"count": count, "time": int(time.time())}
+    params["apiSig"] = _SIG_RAND + generate_api_sig("user.status", **params)
+    return params
+
+async def get_latest_submission_id():
     """Fetches the ID of the most recent submission from Codeforces."""
     try:
         method_name = "user.status"
-        params_for_sig = {
-            "handle": config.CF_HANDLE,
-            "from": 1,
-            "count": 1,
-            "apiKey": config.CF_API_KEY,
-            "time": int(time.time()),
-        }
-        api_sig_hash = generate_api_sig(method_name, **params_for_sig)
-        params = params_for_sig.copy()
-        params["apiSig"] = "123456" + api_sig_hash
-        with httpx.Client(timeout=30.0) as client:
-            response = client.get(constants.CODEFORCES_API_URL + f"/{method_name}", params=params)
-            response.raise_for_status()
-            data = response.json()
+        params = build_user_status_params(1)
+        client = get_http_client()
+        response = await client.get(constants.CODEFORCES_API_URL + f"/{method_name}", params=params)
+        response.raise_for_status()
+        data = response.json()
         if data["status"] == "OK" and data["result"]:
             return data["result"][0]["id"]
         elif data["status"] != "OK":
-            logging.warning(f"Codeforces API error on init: {data.get('comment')}")
+            logging.warning("Codeforces API error on init: %s", data.get('comment'))
     except httpx.RequestError as e:
-        logging.error(f"An error occurred during initial submission fetch: {e}")
+        logging.error("An error occurred during initial submission fetch: %s", e)
     except httpx.HTTPStatusError as e:
-        logging.error(f"Codeforces API returned error status {e.response.status_code} during init: {e}")
+        logging.error("Codeforces API returned error status %s during init: %s", e.response.status_code, e)
     except httpx.TimeoutException as e:
-        logging.error(f"Codeforces API request timed out during init: {e}")
+        logging.error("Codeforces API request timed out during init: %s", e)
     return 0
 
+def _log_poll(rows, last_submission_id):
+    """Logs a poll's solves and advances the cursor past it in one commit. Returns the new solves."""
+    with transaction() as session:
+        new_solves = log_problems_solved(rows, session=session)
+        save_last_submission_id(last_submission_id, session=session)
+    return new_solves
+
 async def check_codeforces_submissions(context: ContextTypes.DEFAULT_TYPE):
     """Checks for new successful Codeforces submissions and sends notifications."""
     logging.info("Checking for new Codeforces submissions...")
     try:
         method_name = "user.status"
-        params_for_sig = {
-            "handle": config.CF_HANDLE,
-            "from": 1,
-            "count": 10,
-            "apiKey": config.CF_API_KEY,
-            "time": int(time.time()),
-        }
-        api_sig_hash = generate_api_sig(method_name, **params_for_sig)
-        params = params_for_sig.copy()
-        params["apiSig"] = "123456" + api_sig_hash
-        # Use async httpx to prevent blocking other scheduled jobs
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(constants.CODEFORCES_API_URL + f"/{method_name}", params=params)
-            response.raise_for_status()
-            data = response.json()
+        params = build_user_status_params(10)
+        # Use the shared async client to prevent blocking other scheduled jobs
+        client = get_http_client()
+        response = await client.get(constants.CODEFORCES_API_URL + f"/{method_name}", params=params)
+        response.raise_for_status()
+        data = response.json()
 
         if data["status"] == "OK":
-            last_processed_id = get_last_submission_id()
+            # Database calls run in a worker thread so the poll does not block the event loop
+            last_processed_id = await asyncio.to_thread(get_last_submission_id)
             new_successful_submissions = []
             if "result" in data:
                 for submission in data["result"]:
@@ -81,51 +87,57 @@ async def check_codeforces_submissions(context: ContextTypes.DEFAULT_TYPE):
 
             if new_successful_submissions:
                 # Process them chronologically
+                batch = []
                 for submission in sorted(new_successful_submissions, key=lambda x: x['creationTimeSeconds']):
                     problem = submission["problem"]
                     problem_id = f"{problem.get('contestId')}-{problem.get('index')}"
-                    rating = problem.get('rating', 'NA')
+                    batch.append((submission, problem_id, problem.get('rating', 'NA')))
 
-                    is_new_unique_solve = log_problem_solved(
-                        platform="codeforces", 
-                        problem_id=problem_id,
-                        rating=rating
-                    )
+                # Log the whole poll in one insert and mark it as seen in the same commit,
+                # including submissions for already solved problems; only problems never solved before come back
+                new_solves = set(await asyncio.to_thread(
+                    _log_poll,
+                    [("codeforces", problem_id, rating) for _, problem_id, rating in batch],
+                    batch[-1][0]["id"]
+                ))
+
+                for submission, problem_id, rating in batch:
+                    problem = submission["problem"]
 
                     # Only send a notification for the first time a problem is solved.
-                    if is_new_unique_solve:
-                        problem_url = f"https://codeforces.com/contest/{problem['contestId']}/problem/{problem['index']}"
-                        
-                        message = format_new_solve_message(
-                            platform="Codeforces",
-                            problem_name=problem['name'],
-                            problem_url=problem_url,
-                            difficulty=str(rating),
-                            language=submission['programmingLanguage'],
-                            runtime=f"{submission['timeConsumedMillis']} ms",
-                            memory=f"{submission['memoryConsumedBytes'] // 1024} KB"
-                        )
-                        
-                        await context.bot.send_message(
-                            config.CHANNEL_ID, 
-                            message, 
-                            disable_web_page_preview=True,
-                            parse_mode=ParseMode.MARKDOWN
-                        )
-                        logging.info(f"Sent notification for new unique problem: CF submission {submission['id']}")
-                        await asyncio.sleep(1) # Avoid rate-limiting Telegram on new solves
+                    if ("codeforces", problem_id) in new_solves:
+                        new_solves.discard(("codeforces", problem_id))
+                        # The solve and cursor are already committed, so a failed send must not stop the rest
+                        try:
+                            problem_url = f"https://codeforces.com/contest/{problem['contestId']}/problem/{problem['index']}"
+                            
+                            message = format_new_solve_message(
+                                platform="Codeforces",
+                                problem_name=problem['name'],
+                                problem_url=problem_url,
+                                difficulty=str(rating),
+                                language=submission['programmingLanguage'],
+                                runtime=f"{submission['timeConsumedMillis']} ms",
+                                memory=f"{submission['memoryConsumedBytes'] // 1024} KB"
+                            )
+                            
+                            await context.bot.send_message(
+                                config.CHANNEL_ID, 
+                                message, 
+                                **SEND_KW
+                            )
+                            logging.info("Sent notification for new unique problem: CF submission %s", submission['id'])
+                        except Exception as e:
+                            logging.error("Failed to send notification for CF submission %s: %s", submission['id'], e, exc_info=True)
                     else:
-                        logging.info(f"Skipping notification for already solved problem: CF submission {submission['id']}")
-                    
-                    # ALWAYS update the last processed ID to mark this submission as seen.
-                    save_last_submission_id(submission["id"])
+                        logging.info("Skipping notification for already solved problem: CF submission %s", submission['id'])
         else:
-            logging.warning(f"Codeforces API returned status: {data.get('comment')}")
+            logging.warning("Codeforces API returned status: %s", data.get('comment'))
     except httpx.RequestError as e:
-        logging.error(f"An error occurred with Codeforces API: {e}")
+        logging.error("An error occurred with Codeforces API: %s", e)
     except httpx.HTTPStatusError as e:
-        logging.error(f"Codeforces API returned error status {e.response.status_code}: {e}")
+        logging.error("Codeforces API returned error status %s: %s", e.response.status_code, e)
     except httpx.TimeoutException as e:
-        logging.error(f"Codeforces API request timed out: {e}")
+        logging.error("Codeforces API request timed out: %s", e)
     except Exception as e:
-        logging.error(f"An unexpected error occurred in Codeforces check: {e}", exc_info=True)
+        logging.error("An unexpected error occurred in Codeforces check: %s", e, exc_info=True)
@@ -0,0 +1,26 @@
+"""Shared HTTP client for the Codeforces and LeetCode APIs."""
+
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Returns the shared AsyncClient, creating it on first use so keep-alive connections are reused."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+        )
+    return _client
+
+
+async def close_http_client():
+    """Closes the shared AsyncClient if it has been created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,16 +1,25 @@
 import httpx
 import asyncio
 import logging
+from functools import lru_cache
 
 from telegram.ext import ContextTypes
-from telegram.constants import ParseMode
 
 from ..config import settings as config
 from ..config import constants
-from ..data.database import log_problem_solved
+from ..data.database import log_problems_solved, transaction
 from ..data.state_manager import get_last_leetcode_timestamp, save_last_leetcode_timestamp
-from ..bot.messaging import format_new_solve_message
+from ..bot.messaging import format_new_solve_message, SEND_KW
+from .http_client import get_http_client
 
+# GraphQL documents are kept whitespace-free so each request body stays small
+RECENT_AC_TIMESTAMP_QUERY = "query recentAcSubmissions($username:String!,$limit:Int!){recentAcSubmissionList(username:$username,limit:$limit){timestamp}}"
+SUBMISSION_DETAILS_QUERY = "query submissionDetails($submissionId:Int!){submissionDetails(submissionId:$submissionId){runtime memory}}"
+QUESTION_DIFFICULTY_QUERY = "query questionData($titleSlug:String!){question(titleSlug:$titleSlug){difficulty}}"
+SUBMISSION_DETAILS_WITH_CODE_QUERY = "query submissionDetails($submissionId:Int!){submissionDetails(submissionId:$submissionId){runtime memory code}}"
+RECENT_AC_SUBMISSIONS_QUERY = "query recentAcSubmissions($username:String!,$limit:Int!){recentAcSubmissionList(username:$username,limit:$limit){id title titleSlug timestamp lang}}"
+
+@lru_cache(maxsize=1)
 def get_leetcode_headers():
     return {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -19,6 +28,7 @@ def get_leetcode_headers():
         "x-requested-with": "XMLHttpRequest",
     }
 
+@lru_cache(maxsize=1)
 def get_leetcode_cookies():
     return {
         "LEETCODE_SESSION": config.LEETCODE_SESSION,
@@ -27,13 +37,7 @@ def get_leetcode_cookies():
 
 async def get_latest_leetcode_submission_timestamp():
     graphql_query = {
-        "query": """
-            query recentAcSubmissions($username: String!, $limit: Int!) {
-                recentAcSubmissionList(username: $username, limit: $limit) {
-                    timestamp
-                }
-            }
-        """,
+        "query": RECENT_AC_TIMESTAMP_QUERY,
         "variables": {
             "username": config.LEETCODE_USERNAME,
             "limit": 1
@@ -41,103 +45,62 @@ async def get_latest_leetcode_submission_timestamp():
     }
     cookies = get_leetcode_cookies()
     headers = get_leetcode_headers()
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if "errors" in data:
-                logging.error(f"LeetCode API error on init: {data['errors']}")
-                return 0
-            submissions = data.get("data", {}).get("recentAcSubmissionList", [])
-            if submissions:
-                return int(submissions[0]["timestamp"])
-        except httpx.RequestError as e:
-            logging.error(f"An error occurred during initial LeetCode submission fetch: {e}")
+    client = get_http_client()
+    try:
+        response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        if "errors" in data:
+            logging.error("LeetCode API error on init: %s", data['errors'])
+            return 0
+        submissions = data.get("data", {}).get("recentAcSubmissionList", [])
+        if submissions:
+            return int(submissions[0]["timestamp"])
+    except httpx.RequestError as e:
+        logging.error("An error occurred during initial LeetCode submission fetch: %s", e)
     return 0
 
-async def get_leetcode_submission_details(submission_id: int):
+async def get_leetcode_submission_details(submission_id: int, include_code: bool = False):
+    """Fetches runtime and memory for a submission, plus its code in the same request when `include_code` is set."""
     graphql_query = {
-        "query": """
-            query submissionDetails($submissionId: Int!) {
-                submissionDetails(submissionId: $submissionId) {
-                    runtime
-                    memory
-                }
-            }
-        """,
+        "query": SUBMISSION_DETAILS_WITH_CODE_QUERY if include_code else SUBMISSION_DETAILS_QUERY,
         "variables": {"submissionId": submission_id},
     }
     cookies = get_leetcode_cookies()
     headers = get_leetcode_headers()
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if "errors" in data:
-                logging.error(f"LeetCode API error on submission detail fetch: {data['errors']}")
-                return None
-            return data.get("data", {}).get("submissionDetails")
-        except httpx.RequestError as e:
-            logging.error(f"An error occurred during LeetCode submission detail fetch: {e}")
+    client = get_http_client()
+    try:
+        response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        if "errors" in data:
+            logging.error("LeetCode API error on submission detail fetch: %s", data['errors'])
+            return None
+        return data.get("data", {}).get("submissionDetails")
+    except httpx.RequestError as e:
+        logging.error("An error occurred during LeetCode submission detail fetch: %s", e)
     return None
 
 async def get_leetcode_problem_difficulty(title_slug: str):
     graphql_query = {
-        "query": """
-            query questionData($titleSlug: String!) {
-                question(titleSlug: $titleSlug) {
-                    difficulty
-                }
-            }
-        """,
+        "query": QUESTION_DIFFICULTY_QUERY,
         "variables": {"titleSlug": title_slug},
     }
     cookies = get_leetcode_cookies()
     headers = get_leetcode_headers()
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if "errors" in data:
-                logging.error(f"LeetCode API error on problem difficulty fetch: {data['errors']}")
-                return None
-            return data.get("data", {}).get("question", {}).get("difficulty")
-        except httpx.RequestError as e:
-            logging.error(f"An error occurred during LeetCode problem difficulty fetch: {e}")
+    client = get_http_client()
+    try:
+        response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+        if "errors" in data:
+            logging.error("LeetCode API error on problem difficulty fetch: %s", data['errors'])
+            return None
+        return data.get("data", {}).get("question", {}).get("difficulty")
+    except httpx.RequestError as e:
+        logging.error("An error occurred during LeetCode problem difficulty fetch: %s", e)
     return None
 
-async def get_submission_code(submission_id: int) -> str:
-    """Gets the code for a LeetCode submission."""
-    graphql_query = {
-        "query": """
-            query submissionDetails($submissionId: Int!) {
-                submissionDetails(submissionId: $submissionId) {
-                    code
-                }
-            }
-        """,
-        "variables": {
-            "submissionId": submission_id
-        }
-    }
-    cookies = get_leetcode_cookies()
-    headers = get_leetcode_headers()
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
-            response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
-            response.raise_for_status()
-            data = response.json()
-            if "errors" in data:
-                logging.error(f"LeetCode API error getting submission code: {data['errors']}")
-                return ""
-            return data.get("data", {}).get("submissionDetails", {}).get("code", "")
-        except httpx.RequestError as e:
-            logging.error(f"Error getting submission code: {e}")
-            return ""
-
 def parse_submission_code(code: str) -> str:
     """Parses the submission code to extract the relevant part."""
     if not code:
@@ -177,21 +140,18 @@ def get_language_extension(language: str) -> str:
     }
     return language_map.get(language.lower(), "text")
 
+def _log_poll(rows, last_timestamp):
+    """Logs a poll's solves and advances the cursor past it in one commit. Returns the new solves."""
+    with transaction() as session:
+        new_solves = log_problems_solved(rows, session=session)
+        save_last_leetcode_timestamp(last_timestamp, session=session)
+    return new_solves
+
 async def check_leetcode_submissions(context: ContextTypes.DEFAULT_TYPE):
     """Checks for new successful LeetCode submissions and sends notifications."""
     logging.info("Checking for new LeetCode submissions...")
     graphql_query = {
-        "query": """
-            query recentAcSubmissions($username: String!, $limit: Int!) {
-              recentAcSubmissionList(username: $username, limit: $limit) {
-                id
-                title
-                titleSlug
-                timestamp
-                lang
-              }
-            }
-        """,
+        "query": RECENT_AC_SUBMISSIONS_QUERY,
         "variables": {
             "username": config.LEETCODE_USERNAME,
             "limit": 15
@@ -200,16 +160,17 @@ async def check_leetcode_submissions(context: ContextTypes.DEFAULT_TYPE):
     cookies = get_leetcode_cookies()
     headers = get_leetcode_headers()
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
-            response.raise_for_status()
-            data = response.json()
+        client = get_http_client()
+        response = await client.post(constants.LEETCODE_API_URL, json=graphql_query, cookies=cookies, headers=headers)
+        response.raise_for_status()
+        data = response.json()
         
         if "errors" in data:
-            logging.error(f"LeetCode API returned an error: {data['errors']}")
+            logging.error("LeetCode API returned an error: %s", data['errors'])
             return
 
-        last_timestamp = get_last_leetcode_timestamp()
+        # Database calls run in a worker thread so the poll does not block the event loop
+        last_timestamp = await asyncio.to_thread(get_last_leetcode_timestamp)
         new_submissions = []
         submissions = data.get("data", {}).get("recentAcSubmissionList", [])
         if submissions:
@@ -218,61 +179,70 @@ async def check_leetcode_submissions(context: ContextTypes.DEFAULT_TYPE):
                     new_submissions.append(sub)
         
         if new_submissions:
-            for sub in sorted(new_submissions, key=lambda x: int(x["timestamp"])):
+            # Difficulty lookups are independent, so fetch them for every distinct problem at once
+            slugs = list(dict.fromkeys(sub["titleSlug"] for sub in new_submissions))
+            difficulties = dict(zip(slugs, await asyncio.gather(*map(get_leetcode_problem_difficulty, slugs))))
+
+            new_submissions.sort(key=lambda x: int(x["timestamp"]))
+            # Log the whole poll in one insert and mark it as seen in the same commit,
+            # including submissions for already solved problems; only problems never solved before come back
+            new_solves = set(await asyncio.to_thread(
+                _log_poll,
+                [("leetcode", sub["titleSlug"], difficulties[sub["titleSlug"]]) for sub in new_submissions],
+                int(new_submissions[-1]["timestamp"])
+            ))
+
+            for sub in new_submissions:
                 problem_id = sub["titleSlug"]
-                difficulty = await get_leetcode_problem_difficulty(sub['titleSlug'])
-                is_new_unique_solve = log_problem_solved(
-                    platform="leetcode", 
-                    problem_id=problem_id,
-                    rating=difficulty
-                )
+                difficulty = difficulties[problem_id]
                 
                 # Only send a notification for the first time a problem is solved.
-                if is_new_unique_solve:
-                    problem_url = f"https://leetcode.com/problems/{sub['titleSlug']}/"
-                    
-                    details = await get_leetcode_submission_details(int(sub['id']))
-                    
-                    runtime = memory = None
-                    if details and details.get('runtime') is not None and details.get('memory') is not None:
-                        runtime = f"{details['runtime']} ms"
-                        memory = f"{details['memory'] // 1024} KB"
-
-                    # Get and parse the submission code only if enabled
-                    code = None
-                    language_ext = None
-                    if config.SEND_SOLUTION_CODE:
-                        code = await get_submission_code(int(sub['id']))
-                        code = parse_submission_code(code)
-                        language_ext = get_language_extension(sub['lang'])
-
-                    message = format_new_solve_message(
-                        platform="LeetCode",
-                        problem_name=sub['title'],
-                        problem_url=problem_url,
-                        difficulty=difficulty,
-                        language=sub['lang'],
-                        runtime=runtime,
-                        memory=memory,
-                        code=code,
-                        language_ext=language_ext
-                    )
-
-                    await context.bot.send_message(
-                        config.CHANNEL_ID, 
-                        message, 
-                        disable_web_page_preview=True,
-                        parse_mode=ParseMode.MARKDOWN
-                    )
-                    logging.info(f"Sent notification for new unique problem: LC submission {sub['id']}")
-                    await asyncio.sleep(1) # Avoid rate-limiting Telegram
+                if ("leetcode", problem_id) in new_solves:
+                    new_solves.discard(("leetcode", problem_id))
+                    # The solve and cursor are already committed, so a failed send must not stop the rest
+                    try:
+                        problem_url = f"https://leetcode.com/problems/{sub['titleSlug']}/"
+                        
+                        details = await get_leetcode_submission_details(
+                            int(sub['id']), include_code=config.SEND_SOLUTION_CODE
+                        )
+                        
+                        runtime = memory = None
+                        if details and details.get('runtime') is not None and details.get('memory') is not None:
+                            runtime = f"{details['runtime']} ms"
+                            memory = f"{details['memory'] // 1024} KB"
+
+                        # Get and parse the submission code only if enabled
+                        code = None
+                        language_ext = None
+                        if config.SEND_SOLUTION_CODE:
+                            code = parse_submission_code((details or {}).get('code') or "")
+                            language_ext = get_language_extension(sub['lang'])
+
+                        message = format_new_solve_message(
+                            platform="LeetCode",
+                            problem_name=sub['title'],
+                            problem_url=problem_url,
+                            difficulty=difficulty,
+                            language=sub['lang'],
+                            runtime=runtime,
+                            memory=memory,
+                            code=code,
+                            language_ext=language_ext
+                        )
+
+                        await context.bot.send_message(
+                            config.CHANNEL_ID, 
+                            message, 
+                            **SEND_KW
+                        )
+                        logging.info("Sent notification for new unique problem: LC submission %s", sub['id'])
+                    except Exception as e:
+                        logging.error("Failed to send notification for LC submission %s: %s", sub['id'], e, exc_info=True)
                 else:
-                    logging.info(f"Skipping notification for already solved problem: LC submission {sub['id']}")
-                
-                # ALWAYS update the last processed timestamp
-                save_last_leetcode_timestamp(int(sub["timestamp"]))
+                    logging.info("Skipping notification for already solved problem: LC submission %s", sub['id'])
 
     except httpx.RequestError as e:
-        logging.error(f"An error occurred with LeetCode API: {e}")
+        logging.error("An error occurred with LeetCode API: %s", e)
     except Exception as e:
-        logging.error(f"An unexpected error occurred in LeetCode check: {e}", exc_info=True)
+        logging.error("An unexpected error occurred in LeetCode check: %s", e, exc_info=True)
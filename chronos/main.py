@@ -1,15 +1,15 @@
 import os
 import sys
+import asyncio
 import logging
-from datetime import time, datetime, timedelta
+from datetime import time, datetime
 import calendar
+from zoneinfo import ZoneInfo
 
-import pytz
-from telegram.ext import Application, ContextTypes
-from telegram.constants import ParseMode
+from telegram.ext import AIORateLimiter, Application, ContextTypes
 
 from .config import settings as config
-from .data.database import init_db, get_monthly_stats_from_db, get_weekly_stats_from_db
+from .data.database import init_db
 from .data.state_manager import (
     get_last_submission_id,
     save_last_submission_id,
@@ -18,6 +18,8 @@ from .data.state_manager import (
 )
 from .integrations.codeforces import get_latest_submission_id, check_codeforces_submissions
 from .integrations.leetcode import get_latest_leetcode_submission_timestamp, check_leetcode_submissions
+from .integrations.http_client import close_http_client
+from .bot.messaging import SEND_KW
 from .bot.handlers import (
     register_handlers,
     test_codeforces_submission,
@@ -25,7 +27,10 @@ from .bot.handlers import (
     send_daily_summary,
     get_daily_summary_message,
     error_handler,
-    _format_summary_message,
+    _cached_summary,
+    _build_report,
+    _format_date,
+    _format_week_range,
     weekly_stats_handler,
 )
 
@@ -37,6 +42,8 @@ logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("apscheduler").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+_TZ = ZoneInfo(config.TIMEZONE)
+
 
 async def post_initialization(application: Application):
     """
@@ -45,13 +52,13 @@ async def post_initialization(application: Application):
     """
     # --- Startup Verification ---
     try:
-        logger.info(f"--- Verifying access to channel {config.CHANNEL_ID} ---")
+        logger.info("--- Verifying access to channel %s ---", config.CHANNEL_ID)
         await application.bot.get_chat(config.CHANNEL_ID)
         logger.info("--- Channel access verified successfully! ---")
     except Exception as e:
-        logger.critical(f"CRITICAL: Could not access channel {config.CHANNEL_ID}.")
+        logger.critical("CRITICAL: Could not access channel %s.", config.CHANNEL_ID)
         logger.critical("Please ensure the bot is in the channel with admin rights.")
-        logger.critical(f"Error details: {e}")
+        logger.critical("Error details: %s", e)
         # Raising an exception here will cause the application to shut down gracefully.
         raise
 
@@ -60,106 +67,105 @@ async def post_initialization(application: Application):
         logger.info("--- RUNNING IN TEST MODE ---")
         if config.TEST_MODE_STATS_ONLY:
             logger.info("--- Testing Daily Summary Only ---")
-            message = get_daily_summary_message()
+            message = await get_daily_summary_message()
             await application.bot.send_message(
                 config.CHANNEL_ID,
                 message,
-                disable_web_page_preview=True,
-                parse_mode=ParseMode.MARKDOWN
+                **SEND_KW
             )
         else:
-            await test_codeforces_submission(application)
-            await test_leetcode_submission(application)
+            # The two platforms are independent, so fetch them concurrently
+            await asyncio.gather(
+                test_codeforces_submission(application),
+                test_leetcode_submission(application),
+                return_exceptions=True
+            )
         
         logger.info("--- TEST MODE FINISHED. ---")
         # Stop the application, which will cause run_polling() to exit.
         application.stop()
         return
 
-    # --- Initial State Sync (Async Part) ---
-    if get_last_leetcode_timestamp() == 0:
+    # --- Initial State Sync ---
+    # Both cursors are seeded over the shared HTTP client, so this runs here rather than before the event loop starts
+    if await asyncio.to_thread(get_last_submission_id) == 0:
+        logger.info("First run for Codeforces. Initializing with the latest submission ID...")
+        latest_id = await get_latest_submission_id()
+        if latest_id:
+            await asyncio.to_thread(save_last_submission_id, latest_id)
+            logger.info("Initialized Codeforces. Will only report submissions newer than ID %s.", latest_id)
+        else:
+            logger.warning("Could not fetch initial Codeforces submission ID.")
+
+    if await asyncio.to_thread(get_last_leetcode_timestamp) == 0:
         logger.info("First run for LeetCode. Initializing with the latest submission timestamp...")
         latest_ts = await get_latest_leetcode_submission_timestamp()
         if latest_ts:
-            save_last_leetcode_timestamp(latest_ts)
-            logger.info(f"Initialized LeetCode. Will only report submissions newer than timestamp {latest_ts}.")
+            await asyncio.to_thread(save_last_leetcode_timestamp, latest_ts)
+            logger.info("Initialized LeetCode. Will only report submissions newer than timestamp %s.", latest_ts)
         else:
             logger.warning("Could not fetch initial LeetCode submission timestamp.")
 
 
+async def post_shutdown(application: Application):
+    """Releases shared resources once the application has stopped."""
+    await close_http_client()
+
+
 async def send_monthly_summary(context: ContextTypes.DEFAULT_TYPE):
     """Sends the monthly summary message to the channel."""
     logging.info("Sending monthly summary...")
-    stats = get_monthly_stats_from_db()
-    summary_details, grand_total = _format_summary_message(stats, 'monthly')
+    summary_details, grand_total = await asyncio.to_thread(_cached_summary, 'monthly')
 
     if grand_total == 0:
-        message = "No problems were solved this month. Let's do better next month! 💪"
+        message = "No problems were solved this month\\. Let's do better next month\\! 💪"
     else:
-        current_date = datetime.now()
-        month_year = current_date.strftime("%B %Y")
-        message = (
-            f"📊 *Monthly Progress Report*\n"
-            f"🗓️ *Period:* {month_year}\n"
-            f"🚀 *Progress Overview*\n\n"
-            f"━━━━━━━━━━━━━━━\n\n"
-            f"{summary_details}\n\n"
-            f"━━━━━━━━━━━━━━━\n\n"
-            f"🎯 *Grand Total Solved This Month:* {grand_total}"
-        )
-
-    await context.bot.send_message(config.CHANNEL_ID, message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
+        month_year = _format_date("%B %Y")
+        message = _build_report("Monthly Progress Report", "Period", month_year, summary_details, "This Month", grand_total)
+
+    await context.bot.send_message(config.CHANNEL_ID, message, **SEND_KW)
     logging.info("Monthly summary sent.")
 
 
 async def send_weekly_summary(context: ContextTypes.DEFAULT_TYPE):
     """Sends the weekly summary message to the channel."""
     logging.info("Sending weekly summary...")
-    stats = get_weekly_stats_from_db()
-    summary_details, grand_total = _format_summary_message(stats, 'weekly')
+    summary_details, grand_total = await asyncio.to_thread(_cached_summary, 'weekly')
 
     if grand_total == 0:
-        message = "No problems were solved this week. Let's step up next week! 💪"
+        message = "No problems were solved this week\\. Let's step up next week\\! 💪"
     else:
-        current_date = datetime.now()
-        # Calculate week range (Monday to Sunday)
-        days_since_monday = current_date.weekday()
-        start_of_week = current_date - timedelta(days=days_since_monday)
-        end_of_week = start_of_week + timedelta(days=6)
-        week_range = f"{start_of_week.strftime('%b %d')} - {end_of_week.strftime('%b %d, %Y')}"
-        
-        message = (
-            f"📊 *Weekly Progress Report*\n"
-            f"🗓️ *Period:* {week_range}\n"
-            f"🚀 *Progress Overview*\n\n"
-            f"━━━━━━━━━━━━━━━\n\n"
-            f"{summary_details}\n\n"
-            f"━━━━━━━━━━━━━━━\n\n"
-            f"🎯 *Grand Total Solved This Week:* {grand_total}"
-        )
-
-    await context.bot.send_message(config.CHANNEL_ID, message, disable_web_page_preview=True, parse_mode=ParseMode.MARKDOWN)
+        week_range = _format_week_range()
+        message = _build_report("Weekly Progress Report", "Period", week_range, summary_details, "This Week", grand_total)
+
+    await context.bot.send_message(config.CHANNEL_ID, message, **SEND_KW)
     logging.info("Weekly summary sent.")
 
 
-async def daily_check_and_send_weekly_summary(context: ContextTypes.DEFAULT_TYPE):
-    """Checks if today is Sunday and sends weekly summary if so."""
-    now = datetime.now(pytz.timezone(config.TIMEZONE))
-    
+async def send_end_of_day_summaries(context: ContextTypes.DEFAULT_TYPE):
+    """
+    Sends the daily summary, plus the weekly one on Sundays and the monthly one on the last day of the month.
+    The daily summary's stats query also fills the weekly and monthly summary caches, so the others reuse it.
+    """
+    now = datetime.now(_TZ)
+    summaries = [send_daily_summary]
+
     # Sunday is 6 in weekday() (Monday=0, Sunday=6)
     if now.weekday() == 6:
         logging.info("Today is Sunday, sending weekly summary...")
-        await send_weekly_summary(context)
+        summaries.append(send_weekly_summary)
 
-
-async def daily_check_and_send_monthly_summary(context: ContextTypes.DEFAULT_TYPE):
-    """Checks if today is the last day of the month and sends monthly summary if so."""
-    now = datetime.now(pytz.timezone(config.TIMEZONE))
     last_day_of_month = calendar.monthrange(now.year, now.month)[1]
-    
     if now.day == last_day_of_month:
         logging.info("Today is the last day of the month, sending monthly summary...")
-        await send_monthly_summary(context)
+        summaries.append(send_monthly_summary)
+
+    # These used to be separate jobs, so keep one failed send from skipping the rest
+    for send_summary in summaries:
+        try:
+            await send_summary(context)
+        except Exception as e:
+            logger.error("Error sending %s: %s", send_summary.__name__, e, exc_info=True)
 
 
 def main() -> None:
@@ -169,11 +175,29 @@ def main() -> None:
     if "--new-session" in sys.argv:
         logger.warning("The --new-session flag is deprecated and has no effect.")
 
+    # Use uvloop when available; run_polling() creates its loop from the active policy.
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop.")
+    except ImportError:
+        pass
+
     # --- Bot Setup ---
     application = (
         Application.builder()
         .token(config.BOT_TOKEN)
         .post_init(post_initialization)
+        .post_shutdown(post_shutdown)
+        # Queues outgoing requests below Telegram's flood limits (30/s overall, 20/min per chat) instead of sleeping between sends,
+        # and retries a send that still gets a RetryAfter so a burst does not drop a notification
+        .rate_limiter(AIORateLimiter(
+            overall_max_rate=25,
+            overall_time_period=1,
+            group_max_rate=18,
+            group_time_period=60,
+            max_retries=3,
+        ))
         .build()
     )
 
@@ -182,39 +206,14 @@ def main() -> None:
     register_handlers(application)
     application.add_error_handler(error_handler)
 
-    # --- Initial State Sync (Sync Part) ---
-    if get_last_submission_id() == 0:
-        logger.info("First run for Codeforces. Initializing with the latest submission ID...")
-        latest_id = get_latest_submission_id()
-        if latest_id:
-            save_last_submission_id(latest_id)
-            logger.info(f"Initialized Codeforces. Will only report submissions newer than ID {latest_id}.")
-        else:
-            logger.warning("Could not fetch initial Codeforces submission ID.")
-
     # --- Schedule Jobs ---
     job_queue = application.job_queue
-    tz = pytz.timezone(config.TIMEZONE)
-
-    # Daily summary at 23:59
-    job_queue.run_daily(
-        send_daily_summary,
-        time=time(hour=23, minute=59, second=0, tzinfo=tz),
-        name="daily_summary",
-    )
-
-    # Weekly summary at 23:59 on Sunday
-    job_queue.run_daily(
-        daily_check_and_send_weekly_summary,
-        time=time(hour=23, minute=59, second=0, tzinfo=tz),
-        name="weekly_summary",
-    )
 
-    # Monthly summary at 23:59 on the last day of each month
+    # Daily summary at 23:59, followed by the weekly one on Sunday and the monthly one on the last day of each month
     job_queue.run_daily(
-        daily_check_and_send_monthly_summary,
-        time=time(hour=23, minute=59, second=0, tzinfo=tz),
-        name="monthly_summary",
+        send_end_of_day_summaries,
+        time=time(hour=23, minute=59, second=0, tzinfo=_TZ),
+        name="end_of_day_summaries",
     )
 
     # Codeforces and LeetCode checkers